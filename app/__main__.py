@@ -0,0 +1,25 @@
+import uvicorn
+
+from app.config import get_settings
+
+
+def main() -> None:
+    settings = get_settings()
+    # "auto" resolves to uvloop/httptools when uvicorn[standard] is installed and
+    # falls back to asyncio/h11 elsewhere (e.g. uvloop is unavailable on Windows).
+    uvicorn.run(
+        "app.main:app",
+        host=settings.app_host,
+        port=settings.app_port,
+        reload=settings.app_reload,
+        workers=None if settings.app_reload else settings.app_workers,
+        loop="auto",
+        http="auto",
+        backlog=settings.app_backlog,
+        limit_concurrency=settings.app_limit_concurrency or None,
+        timeout_keep_alive=settings.app_timeout_keep_alive,
+    )
+
+
+if __name__ == "__main__":
+    main()
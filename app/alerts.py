@@ -1,28 +1,64 @@
-import json
+import asyncio
 import logging
-import urllib.error
-import urllib.request
+
+import httpx
 
 from app.config import get_settings
 
+_MAX_ATTEMPTS = 3
+_BACKOFF_BASE_SECONDS = 0.5
+
+_client: httpx.AsyncClient | None = None
+# Strong references to in-flight alert tasks; the loop itself only keeps weak ones.
+_pending: set[asyncio.Task] = set()
+
+logger = logging.getLogger("behavioral.alerts")
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=5.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        )
+    return _client
 
-def send_security_alert(event: dict) -> None:
+
+async def close_alert_client() -> None:
+    """Wait for queued alerts, then close the pooled webhook client; a new one is created lazily on next use."""
+    global _client
+    if _pending:
+        await asyncio.gather(*_pending, return_exceptions=True)
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def send_security_alert(event: dict) -> None:
     """Send security alerts to an external webhook if configured."""
     settings = get_settings()
     webhook_url = (settings.alert_webhook_url or "").strip()
     if not webhook_url:
         return
 
-    payload = json.dumps(event).encode("utf-8")
-    request = urllib.request.Request(
-        webhook_url,
-        data=payload,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    try:
-        with urllib.request.urlopen(request, timeout=5) as response:
-            if response.status >= 300:
-                logging.warning("Security alert webhook returned status %s", response.status)
-    except urllib.error.URLError as exc:
-        logging.error("Failed to deliver security alert webhook: %s", exc)
+    client = _get_client()
+    for attempt in range(_MAX_ATTEMPTS):
+        try:
+            response = await client.post(webhook_url, json=event)
+            if response.status_code < 500:
+                if response.status_code >= 300:
+                    logger.warning("Security alert webhook returned status %s", response.status_code)
+                return
+            logger.warning("Security alert webhook returned status %s", response.status_code)
+        except httpx.HTTPError as exc:
+            logger.error("Failed to deliver security alert webhook: %s", exc)
+        if attempt + 1 < _MAX_ATTEMPTS:
+            await asyncio.sleep(_BACKOFF_BASE_SECONDS * (2**attempt))
+
+
+def dispatch_security_alert(event: dict) -> None:
+    """Schedule ``send_security_alert`` without waiting on the webhook and its retries."""
+    task = asyncio.create_task(send_security_alert(event))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
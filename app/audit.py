@@ -0,0 +1,148 @@
+import asyncio
+import logging
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.database import AuthDatabase
+
+_STOP = object()
+
+
+class _Flush:
+    def __init__(self, done: asyncio.Future):
+        self.done = done
+
+
+class AuditLogBuffer:
+    """Queue login attempts and security events and write them in batches.
+
+    Rows are flushed with one executemany per table once ``batch_size`` rows
+    are waiting or ``flush_interval`` seconds have passed since the first one.
+    ``stop()`` flushes whatever is still queued. Before ``start()`` (or after
+    ``stop()``) each row is written on the threadpool. When the queue is full the
+    caller waits for room, so a burst costs latency rather than audit rows.
+    """
+
+    def __init__(
+        self,
+        db: AuthDatabase,
+        batch_size: int = 50,
+        flush_interval: float = 0.1,
+        max_queue: int = 1000,
+    ):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.logger = logging.getLogger("behavioral.audit")
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        queue = self._queue
+        await queue.put(_STOP)
+        await self._task
+        self._task = None
+        self._queue = None
+        late = []
+        waiters = []
+        while not queue.empty():
+            item = queue.get_nowait()
+            if isinstance(item, _Flush):
+                waiters.append(item.done)
+            else:
+                late.append(item)
+        await run_in_threadpool(self._write_batch, late)
+        for done in waiters:
+            if not done.done():
+                done.set_result(None)
+
+    async def flush(self) -> None:
+        """Wait until everything queued before this call has been written."""
+        if self._task is None:
+            return
+        done = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Flush(done))
+        await done
+
+    async def log_login_attempt(
+        self,
+        username: str,
+        success: int,
+        risk_score: float | None = None,
+        ip_address: str | None = None,
+    ) -> None:
+        await self._put(("login_attempt", (username, success, risk_score, ip_address)))
+
+    async def log_security_event(
+        self,
+        username: str,
+        event_type: str,
+        reason: str,
+        session_id: str | None = None,
+        risk_score: float | None = None,
+    ) -> None:
+        await self._put(("security_event", (username, session_id, risk_score, event_type, reason)))
+
+    async def _put(self, item: tuple[str, tuple]) -> None:
+        if self._queue is None:
+            await run_in_threadpool(self._write_batch, [item])
+            return
+        await self._queue.put(item)
+
+    async def _flush_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            batch = []
+            waiters = []
+            if isinstance(item, _Flush):
+                waiters.append(item.done)
+            else:
+                batch.append(item)
+            deadline = loop.time() + self.flush_interval
+            # A flush request ends the batch early instead of waiting out the interval.
+            while len(batch) < self.batch_size and not waiters:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                if isinstance(item, _Flush):
+                    waiters.append(item.done)
+                else:
+                    batch.append(item)
+            if batch:
+                await run_in_threadpool(self._write_batch, batch)
+            for done in waiters:
+                if not done.done():
+                    done.set_result(None)
+
+    def _write_batch(self, batch: list[tuple[str, tuple]]) -> None:
+        login_rows = [row for kind, row in batch if kind == "login_attempt"]
+        event_rows = [row for kind, row in batch if kind == "security_event"]
+        for rows, writer in (
+            (login_rows, self.db.log_login_attempts_bulk),
+            (event_rows, self.db.log_security_events_bulk),
+        ):
+            if not rows:
+                continue
+            result = writer(rows)
+            if not result.get("success"):
+                self.logger.error("Failed to write %s audit rows: %s", len(rows), result.get("error"))
@@ -6,21 +6,32 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
-    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore", frozen=True)
 
     app_name: str = "Behavioral Auth API"
     app_env: str = "development"
     app_host: str = "0.0.0.0"
     app_port: int = 5000
-    app_reload: bool = True
+    app_reload: bool = False
+    app_workers: int = 1
+    app_backlog: int = 2048
+    app_limit_concurrency: int = 1000
+    app_timeout_keep_alive: int = 15
+    threadpool_max_workers: int = 100
+    password_hash_workers: int = 0
 
     allowed_origins: list[str] = Field(default_factory=lambda: ["*"])
 
     db_path: str = str((Path(__file__).resolve().parents[1] / "backend" / "users.db"))
     database_url: str = ""
+    database_prepare_threshold: int = 1
+    database_pool_size: int = 25
+    sqlite_checkpoint_interval_seconds: int = 30
     frontend_dir: str = str((Path(__file__).resolve().parents[1] / "frontend"))
     upload_dir: str = str((Path(__file__).resolve().parents[1] / "uploads"))
 
+    login_max_failures: int = 144
+    login_failure_window_seconds: int = 86400
     high_risk_threshold: float = 0.7
     anomaly_block_threshold: float = 0.7
     max_behavior_history_limit: int = 100
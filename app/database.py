@@ -1,284 +1,625 @@
+import atexit
 import hashlib
 import hmac
-import json
+import multiprocessing
 import os
+import queue
 import secrets
 import sqlite3
-from functools import lru_cache
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial
+
+import orjson
+
+from app.cache import TTLCache
 
 try:
     import psycopg
 except Exception:  # pylint: disable=broad-except
     psycopg = None
 
+try:
+    from argon2 import PasswordHasher
+    from argon2 import exceptions as argon2_exceptions
+except Exception:  # pylint: disable=broad-except
+    PasswordHasher = None
+    argon2_exceptions = None
+
+try:
+    # Drop-in for hashlib.pbkdf2_hmac that hoists the HMAC key setup out of the iteration loop.
+    from fastpbkdf2 import pbkdf2_hmac as _fast_pbkdf2_hmac
+except Exception:  # pylint: disable=broad-except
+    _fast_pbkdf2_hmac = None
+
+PBKDF2_ITERATIONS = 100000
+_pbkdf2_hmac = _fast_pbkdf2_hmac or hashlib.pbkdf2_hmac
+_password_hasher = (
+    PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1) if PasswordHasher is not None else None
+)
+
+# Bump when _init_schema changes; databases at this version skip schema setup.
+SCHEMA_VERSION = 2
+
+# Applied once per pooled SQLite connection. WAL lets readers run alongside the
+# writer and, with synchronous=NORMAL, commits no longer fsync on every write.
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+# Per-connection prepared statement cache; the hot auth queries stay compiled
+# for the lifetime of the pooled connection.
+_SQLITE_CACHED_STATEMENTS = 256
+
+
+# Databases already set up by this process, keyed by (backend, resolved path or URL).
+# Later SQLite instances skip the directory check but still probe user_version,
+# so a file deleted and recreated under the same path gets its schema again;
+# later PostgreSQL instances skip the schema probe.
+_initialized_databases: set[tuple[str, str]] = set()
+_initialized_databases_lock = threading.Lock()
+
+# Live instances, closed by one atexit hook without keeping any of them alive.
+_open_databases: "weakref.WeakSet[AuthDatabase]" = weakref.WeakSet()
+
+
+def _close_open_databases() -> None:
+    for database in list(_open_databases):
+        database.close()
+
+
+atexit.register(_close_open_databases)
+
+# Optional process pool for the password KDFs, see configure_password_hash_pool().
+_kdf_pool: ProcessPoolExecutor | None = None
+# Without the pool, KDFs run on the request threadpool, which is far larger than
+# the CPU count; each Argon2 hash holds 64 MiB, so cap how many run at once.
+_kdf_slots = threading.BoundedSemaphore(os.cpu_count() or 1)
+
+
+def _pbkdf2_hash(password: str, salt: str) -> str:
+    return _pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("utf-8"), PBKDF2_ITERATIONS).hex()
+
+
+def _hash_password(password: str) -> tuple[str, str]:
+    if _password_hasher is not None:
+        # Argon2id PHC strings embed their own salt, so the salt column stays empty.
+        return _password_hasher.hash(password), ""
+    salt = secrets.token_hex(32)
+    return _pbkdf2_hash(password, salt), salt
+
+
+def _verify_password(password: str, stored_hash: str, salt: str) -> bool:
+    if stored_hash.startswith("$argon2"):
+        if _password_hasher is None:
+            raise RuntimeError("Argon2 password hash found but argon2-cffi is not installed.")
+        try:
+            return _password_hasher.verify(stored_hash, password)
+        except (argon2_exceptions.VerificationError, argon2_exceptions.InvalidHashError):
+            return False
+    # Legacy PBKDF2-SHA256 rows store a hex digest; compare the raw 32 bytes instead of re-encoding.
+    try:
+        expected = bytes.fromhex(stored_hash)
+    except ValueError:
+        return False
+    digest = _pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("utf-8"), PBKDF2_ITERATIONS)
+    return hmac.compare_digest(digest, expected)
+
+
+def _encode_event(event: dict) -> str:
+    # orjson is several times faster than json.dumps on these small numeric dicts;
+    # payloads stay JSON text so existing rows and SQL json functions still read them.
+    return orjson.dumps(event).decode("utf-8")
+
 
-class _CursorProxy:
-    def __init__(self, cursor, is_postgres: bool):
-        self._cursor = cursor
-        self._is_postgres = is_postgres
+def _needs_rehash(stored_hash: str) -> bool:
+    if _password_hasher is None:
+        return False
+    if not stored_hash.startswith("$argon2"):
+        return True
+    try:
+        return _password_hasher.check_needs_rehash(stored_hash)
+    except argon2_exceptions.InvalidHashError:
+        return False
 
-    def execute(self, query: str, params=None):
-        sql = query.replace("?", "%s") if self._is_postgres else query
-        if params is None:
-            return self._cursor.execute(sql)
-        return self._cursor.execute(sql, params)
 
-    def __getattr__(self, item):
-        return getattr(self._cursor, item)
+def _run_kdf(func, *args):
+    pool = _kdf_pool
+    if pool is None:
+        with _kdf_slots:
+            return func(*args)
+    return pool.submit(func, *args).result()
 
 
-class _ConnectionProxy:
-    def __init__(self, conn, is_postgres: bool):
-        self._conn = conn
-        self._is_postgres = is_postgres
+def _hash_passwords(passwords: list[str]) -> list[tuple[str, str]]:
+    pool = _kdf_pool
+    if pool is not None:
+        return list(pool.map(_hash_password, passwords))
+    if len(passwords) < 2:
+        return [_run_kdf(_hash_password, password) for password in passwords]
+    # argon2-cffi and hashlib release the GIL while hashing, so threads use every core.
+    with ThreadPoolExecutor(max_workers=min(len(passwords), os.cpu_count() or 1)) as executor:
+        return list(executor.map(partial(_run_kdf, _hash_password), passwords))
 
-    def cursor(self):
-        return _CursorProxy(self._conn.cursor(), self._is_postgres)
 
-    def __getattr__(self, item):
-        return getattr(self._conn, item)
+def configure_password_hash_pool(workers: int) -> None:
+    """Run password hashing in ``workers`` processes; 0 keeps it in the calling thread
+    and a negative value sizes the pool to the CPU count.
+
+    Either way at most one hash per worker (or per CPU when hashing in-thread)
+    runs at once, so Argon2's 64 MiB per hash stays bounded whatever the
+    request threadpool size.
+    """
+    global _kdf_pool
+    shutdown_password_hash_pool()
+    if workers < 0:
+        workers = os.cpu_count() or 1
+    if workers > 0:
+        # spawn, not fork: the parent already runs the event loop and DB threads.
+        _kdf_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def shutdown_password_hash_pool() -> None:
+    global _kdf_pool
+    pool, _kdf_pool = _kdf_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+@lru_cache(maxsize=256)
+def _to_pg_placeholders(query: str) -> str:
+    # Call sites pass literal SQL, so each distinct statement is translated once.
+    return query.replace("?", "%s")
+
+
+if psycopg is not None:
+
+    class _PgCursor(psycopg.Cursor):
+        """psycopg cursor that accepts the sqlite-style ``?`` placeholders used throughout."""
+
+        def execute(self, query, params=None, **kwargs):
+            return super().execute(_to_pg_placeholders(query), params, **kwargs)
+
+        def executemany(self, query, params_seq, **kwargs):
+            return super().executemany(_to_pg_placeholders(query), params_seq, **kwargs)
+
+else:
+    _PgCursor = None
 
 
 class AuthDatabase:
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        user_cache_size: int = 10000,
+        user_cache_ttl: float = 30.0,
+        pg_pool_size: int = 25,
+        pg_prepare_threshold: int | None = 1,
+    ):
         self.db_path = db_path
         self.is_postgres = db_path.startswith("postgresql://") or db_path.startswith("postgres://")
-        if not self.is_postgres:
-            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
-        self._init_schema()
+        self.pg_prepare_threshold = pg_prepare_threshold
+        self._local = threading.local()
+        self._sqlite_connections: list = []
+        self._sqlite_connections_lock = threading.Lock()
+        # Idle PostgreSQL connections; LIFO keeps the most recently used (warmest) ones in play.
+        self._pg_pool: queue.LifoQueue = queue.LifoQueue(maxsize=pg_pool_size)
+        # Short-lived cache for the per-request user/blocked lookups; writes through
+        # this instance invalidate it, writes from other processes age out via the TTL.
+        self._user_cache = TTLCache(maxsize=user_cache_size, ttl=user_cache_ttl)
+        # Project ownership never changes once created, so access checks can skip the SELECT.
+        self._project_owner_cache = TTLCache(maxsize=user_cache_size, ttl=user_cache_ttl)
+        _open_databases.add(self)
+        key = ("postgres", db_path) if self.is_postgres else ("sqlite", os.path.realpath(db_path))
+        with _initialized_databases_lock:
+            first = key not in _initialized_databases
+            if first and not self.is_postgres:
+                os.makedirs(os.path.dirname(key[1]), exist_ok=True)
+            if first or not self.is_postgres:
+                self._init_schema()
+            _initialized_databases.add(key)
 
     def _connect(self):
         if self.is_postgres:
             if psycopg is None:
                 raise RuntimeError("PostgreSQL configured but psycopg is not installed.")
-            return _ConnectionProxy(psycopg.connect(self.db_path), True)
-        return _ConnectionProxy(sqlite3.connect(self.db_path, timeout=10), False)
+            # Pooled connections keep their server-side prepared statements, so the
+            # hot auth/audit statements are parsed and planned once per connection.
+            return psycopg.connect(
+                self.db_path,
+                prepare_threshold=self.pg_prepare_threshold,
+                cursor_factory=_PgCursor,
+            )
+        raw = sqlite3.connect(
+            self.db_path,
+            timeout=10,
+            check_same_thread=False,
+            cached_statements=_SQLITE_CACHED_STATEMENTS,
+        )
+        for pragma in _SQLITE_PRAGMAS:
+            raw.execute(pragma)
+        return raw
+
+    @contextmanager
+    def _conn(self):
+        """Yield a connection and commit on success, rolling back on error.
+
+        SQLite connections are cached per thread and reused across calls;
+        PostgreSQL connections are borrowed from a bounded LIFO pool.
+        """
+        if self.is_postgres:
+            try:
+                conn = self._pg_pool.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+        else:
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._connect()
+                self._local.conn = conn
+                with self._sqlite_connections_lock:
+                    self._sqlite_connections.append(conn)
+        reusable = True
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:  # pylint: disable=broad-except
+                reusable = False
+            raise
+        finally:
+            if self.is_postgres:
+                self._release_pg(conn, reusable)
+
+    def _release_pg(self, conn, reusable: bool) -> None:
+        if reusable and not conn.closed and not getattr(conn, "broken", False):
+            try:
+                self._pg_pool.put_nowait(conn)
+                return
+            except queue.Full:
+                pass
+        try:
+            conn.close()
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    def close(self) -> None:
+        with self._sqlite_connections_lock:
+            connections, self._sqlite_connections = self._sqlite_connections, []
+        while True:
+            try:
+                connections.append(self._pg_pool.get_nowait())
+            except queue.Empty:
+                break
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:  # pylint: disable=broad-except
+                pass
+        self._local = threading.local()
+
+    def checkpoint_wal(self) -> dict:
+        """Fold the SQLite WAL back into the database file and truncate it; no-op on Postgres."""
+        if self.is_postgres:
+            return {"success": True, "busy": False}
+        try:
+            with self._conn() as conn:
+                busy, wal_pages, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            return {"success": True, "busy": bool(busy), "wal_pages": wal_pages, "checkpointed": checkpointed}
+        except Exception as exc:  # pylint: disable=broad-except
+            return {"success": False, "error": str(exc)}
 
     @staticmethod
     def _is_unique_violation(exc: Exception) -> bool:
         return "unique" in str(exc).lower()
 
     def _init_schema(self) -> None:
-        conn = self._connect()
-        cursor = conn.cursor()
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            # Already-migrated databases skip all DDL, so worker start-up issues no writes.
+            if self._get_schema_version(cursor) >= SCHEMA_VERSION:
+                return
 
-        if self.is_postgres:
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS users (
-                    id BIGSERIAL PRIMARY KEY,
-                    username TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    salt TEXT NOT NULL,
-                    role TEXT NOT NULL DEFAULT 'user',
-                    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                    last_login TIMESTAMPTZ,
-                    is_active BOOLEAN DEFAULT TRUE
+            if self.is_postgres:
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS users (
+                        id BIGSERIAL PRIMARY KEY,
+                        username TEXT UNIQUE NOT NULL,
+                        password_hash TEXT NOT NULL,
+                        salt TEXT NOT NULL,
+                        role TEXT NOT NULL DEFAULT 'user',
+                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+                        last_login TIMESTAMPTZ,
+                        is_active BOOLEAN DEFAULT TRUE
+                    )
+                    """
                 )
-                """
-            )
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS behavioral_profiles (
-                    id BIGSERIAL PRIMARY KEY,
-                    user_id BIGINT NOT NULL REFERENCES users (id),
-                    session_id TEXT UNIQUE NOT NULL,
-                    keystroke_data TEXT,
-                    mouse_data TEXT,
-                    risk_score DOUBLE PRECISION,
-                    timestamp TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS behavioral_profiles (
+                        id BIGSERIAL PRIMARY KEY,
+                        user_id BIGINT NOT NULL REFERENCES users (id),
+                        session_id TEXT UNIQUE NOT NULL,
+                        keystroke_data TEXT,
+                        mouse_data TEXT,
+                        risk_score DOUBLE PRECISION,
+                        timestamp TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+                    )
+                    """
                 )
-                """
-            )
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS login_attempts (
-                    id BIGSERIAL PRIMARY KEY,
-                    username TEXT NOT NULL,
-                    success BOOLEAN NOT NULL,
-                    risk_score DOUBLE PRECISION,
-                    ip_address TEXT,
-                    timestamp TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS login_attempts (
+                        id BIGSERIAL PRIMARY KEY,
+                        username TEXT NOT NULL,
+                        success BOOLEAN NOT NULL,
+                        risk_score DOUBLE PRECISION,
+                        ip_address TEXT,
+                        timestamp TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+                    )
+                    """
                 )
-                """
-            )
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS security_events (
-                    id BIGSERIAL PRIMARY KEY,
-                    username TEXT NOT NULL,
-                    session_id TEXT,
-                    risk_score DOUBLE PRECISION,
-                    event_type TEXT NOT NULL,
-                    reason TEXT,
-                    timestamp TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS security_events (
+                        id BIGSERIAL PRIMARY KEY,
+                        username TEXT NOT NULL,
+                        session_id TEXT,
+                        risk_score DOUBLE PRECISION,
+                        event_type TEXT NOT NULL,
+                        reason TEXT,
+                        timestamp TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+                    )
+                    """
                 )
-                """
-            )
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS projects (
-                    id BIGSERIAL PRIMARY KEY,
-                    owner_id BIGINT NOT NULL REFERENCES users (id),
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS projects (
+                        id BIGSERIAL PRIMARY KEY,
+                        owner_id BIGINT NOT NULL REFERENCES users (id),
+                        name TEXT NOT NULL,
+                        description TEXT,
+                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+                    )
+                    """
                 )
-                """
-            )
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS tasks (
-                    id BIGSERIAL PRIMARY KEY,
-                    project_id BIGINT NOT NULL REFERENCES projects (id),
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    status TEXT NOT NULL DEFAULT 'todo',
-                    priority TEXT NOT NULL DEFAULT 'medium',
-                    assignee_id BIGINT REFERENCES users (id),
-                    due_date TEXT,
-                    created_by BIGINT NOT NULL REFERENCES users (id),
-                    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS tasks (
+                        id BIGSERIAL PRIMARY KEY,
+                        project_id BIGINT NOT NULL REFERENCES projects (id),
+                        title TEXT NOT NULL,
+                        description TEXT,
+                        status TEXT NOT NULL DEFAULT 'todo',
+                        priority TEXT NOT NULL DEFAULT 'medium',
+                        assignee_id BIGINT REFERENCES users (id),
+                        due_date TEXT,
+                        created_by BIGINT NOT NULL REFERENCES users (id),
+                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+                    )
+                    """
                 )
-                """
-            )
-        else:
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    salt TEXT NOT NULL,
-                    role TEXT NOT NULL DEFAULT 'user',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_login TIMESTAMP,
-                    is_active BOOLEAN DEFAULT 1
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS behavioral_events (
+                        id BIGSERIAL PRIMARY KEY,
+                        profile_id BIGINT NOT NULL REFERENCES behavioral_profiles (id),
+                        kind TEXT NOT NULL,
+                        payload TEXT NOT NULL
+                    )
+                    """
                 )
-                """
-            )
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS behavioral_profiles (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    session_id TEXT UNIQUE NOT NULL,
-                    keystroke_data TEXT,
-                    mouse_data TEXT,
-                    risk_score REAL,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (id)
+            else:
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS users (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        username TEXT UNIQUE NOT NULL,
+                        password_hash TEXT NOT NULL,
+                        salt TEXT NOT NULL,
+                        role TEXT NOT NULL DEFAULT 'user',
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        last_login TIMESTAMP,
+                        is_active BOOLEAN DEFAULT 1
+                    )
+                    """
                 )
-                """
-            )
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS login_attempts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT NOT NULL,
-                    success BOOLEAN NOT NULL,
-                    risk_score REAL,
-                    ip_address TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS behavioral_profiles (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id INTEGER NOT NULL,
+                        session_id TEXT UNIQUE NOT NULL,
+                        keystroke_data TEXT,
+                        mouse_data TEXT,
+                        risk_score REAL,
+                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (user_id) REFERENCES users (id)
+                    )
+                    """
                 )
-                """
-            )
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS security_events (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT NOT NULL,
-                    session_id TEXT,
-                    risk_score REAL,
-                    event_type TEXT NOT NULL,
-                    reason TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS login_attempts (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        username TEXT NOT NULL,
+                        success BOOLEAN NOT NULL,
+                        risk_score REAL,
+                        ip_address TEXT,
+                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                    """
                 )
-                """
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS security_events (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        username TEXT NOT NULL,
+                        session_id TEXT,
+                        risk_score REAL,
+                        event_type TEXT NOT NULL,
+                        reason TEXT,
+                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                    """
+                )
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS projects (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        owner_id INTEGER NOT NULL,
+                        name TEXT NOT NULL,
+                        description TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (owner_id) REFERENCES users (id)
+                    )
+                    """
+                )
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS tasks (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        project_id INTEGER NOT NULL,
+                        title TEXT NOT NULL,
+                        description TEXT,
+                        status TEXT NOT NULL DEFAULT 'todo',
+                        priority TEXT NOT NULL DEFAULT 'medium',
+                        assignee_id INTEGER,
+                        due_date TEXT,
+                        created_by INTEGER NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (project_id) REFERENCES projects (id),
+                        FOREIGN KEY (assignee_id) REFERENCES users (id),
+                        FOREIGN KEY (created_by) REFERENCES users (id)
+                    )
+                    """
+                )
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS behavioral_events (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        profile_id INTEGER NOT NULL,
+                        kind TEXT NOT NULL,
+                        payload TEXT NOT NULL,
+                        FOREIGN KEY (profile_id) REFERENCES behavioral_profiles (id)
+                    )
+                    """
+                )
+
+            # Composite (key, timestamp DESC) indexes serve the "latest N" queries
+            # without a sort and supersede the old single-column key indexes.
+            for redundant in (
+                "idx_profiles_user_id",
+                "idx_login_attempts_username",
+                "idx_security_events_username",
+                "idx_projects_owner_id",
+                "idx_tasks_project_id",
+                # Duplicated the index behind UNIQUE(username).
+                "idx_users_username",
+            ):
+                cursor.execute(f"DROP INDEX IF EXISTS {redundant}")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_profiles_user_id_ts ON behavioral_profiles(user_id, timestamp DESC)"
             )
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_profiles_ts ON behavioral_profiles(timestamp DESC)")
             cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS projects (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    owner_id INTEGER NOT NULL,
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (owner_id) REFERENCES users (id)
+                "CREATE INDEX IF NOT EXISTS idx_login_attempts_username_ts ON login_attempts(username, timestamp DESC)"
+            )
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_login_attempts_timestamp ON login_attempts(timestamp)")
+            if self.is_postgres:
+                # Covering variant: the per-user event listing becomes an index-only scan.
+                cursor.execute("DROP INDEX IF EXISTS idx_security_events_username_ts")
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_security_events_username_ts_cov
+                    ON security_events(username, timestamp DESC)
+                    INCLUDE (session_id, risk_score, event_type, reason)
+                    """
                 )
-                """
+            else:
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_security_events_username_ts ON security_events(username, timestamp DESC)"
+                )
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_security_events_ts ON security_events(timestamp DESC)")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_projects_owner_updated ON projects(owner_id, updated_at DESC, id DESC)"
             )
             cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS tasks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    project_id INTEGER NOT NULL,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    status TEXT NOT NULL DEFAULT 'todo',
-                    priority TEXT NOT NULL DEFAULT 'medium',
-                    assignee_id INTEGER,
-                    due_date TEXT,
-                    created_by INTEGER NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (project_id) REFERENCES projects (id),
-                    FOREIGN KEY (assignee_id) REFERENCES users (id),
-                    FOREIGN KEY (created_by) REFERENCES users (id)
-                )
-                """
+                "CREATE INDEX IF NOT EXISTS idx_tasks_project_updated ON tasks(project_id, updated_at DESC, id DESC)"
             )
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_assignee_id ON tasks(assignee_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_behavioral_events_profile_id ON behavioral_events(profile_id)")
+
+            self._ensure_schema_migrations(conn)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)")
+            if self.is_postgres:
+                # Lets the login credential lookup run as an index-only scan. SQLite always
+                # probes the UNIQUE(username) autoindex for this equality, so it gets none.
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_users_username_cred
+                    ON users(username) INCLUDE (password_hash, salt, role, is_active)
+                    """
+                )
+            else:
+                cursor.execute(
+                    """
+                    CREATE TRIGGER IF NOT EXISTS tasks_touch_project
+                    AFTER INSERT ON tasks
+                    BEGIN
+                        UPDATE projects SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.project_id;
+                    END
+                    """
+                )
+                # Refresh planner statistics when they are missing or stale so the new indexes get picked.
+                cursor.execute("PRAGMA optimize")
+            self._set_schema_version(cursor)
 
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_profiles_user_id ON behavioral_profiles(user_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_login_attempts_username ON login_attempts(username)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_login_attempts_timestamp ON login_attempts(timestamp)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_security_events_username ON security_events(username)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_projects_owner_id ON projects(owner_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_project_id ON tasks(project_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_assignee_id ON tasks(assignee_id)")
-
-        conn.commit()
-        self._ensure_schema_migrations(conn)
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)")
-        conn.commit()
-        conn.close()
+    def _get_schema_version(self, cursor) -> int:
+        if not self.is_postgres:
+            cursor.execute("PRAGMA user_version")
+            return cursor.fetchone()[0]
+        cursor.execute("SELECT to_regclass('schema_version')")
+        if cursor.fetchone()[0] is None:
+            return 0
+        cursor.execute("SELECT MAX(version) FROM schema_version")
+        row = cursor.fetchone()
+        return row[0] or 0
 
-    def _ensure_schema_migrations(self, conn) -> None:
-        cursor = conn.cursor()
+    def _set_schema_version(self, cursor) -> None:
+        if not self.is_postgres:
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            return
+        cursor.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+        cursor.execute("DELETE FROM schema_version")
+        cursor.execute("INSERT INTO schema_version (version) VALUES (?)", (SCHEMA_VERSION,))
+
+    def _column_exists(self, cursor, table: str, column: str) -> bool:
         if self.is_postgres:
             cursor.execute(
-                """
-                SELECT column_name
-                FROM information_schema.columns
-                WHERE table_name = 'users'
-                """
+                "SELECT 1 FROM information_schema.columns WHERE table_name = ? AND column_name = ?",
+                (table, column),
             )
-            columns = {row[0] for row in cursor.fetchall()}
-            if "role" not in columns:
-                cursor.execute("ALTER TABLE users ADD COLUMN role TEXT NOT NULL DEFAULT 'user'")
-                conn.commit()
         else:
-            cursor.execute("PRAGMA table_info(users)")
-            columns = {row[1] for row in cursor.fetchall()}
-            if "role" not in columns:
-                cursor.execute("ALTER TABLE users ADD COLUMN role TEXT NOT NULL DEFAULT 'user'")
-                conn.commit()
+            cursor.execute("SELECT 1 FROM pragma_table_info(?) WHERE name = ?", (table, column))
+        return cursor.fetchone() is not None
 
-            cursor.execute("PRAGMA table_info(tasks)")
-            task_columns = {row[1] for row in cursor.fetchall()}
-            if "status" in task_columns:
-                cursor.execute(
-                    """
-                    UPDATE tasks
-                    SET status = 'todo'
-                    WHERE status NOT IN ('todo', 'in_progress', 'review', 'done')
-                    """
-                )
-                conn.commit()
+    def _ensure_schema_migrations(self, conn) -> None:
+        cursor = conn.cursor()
+        if not self._column_exists(cursor, "users", "role"):
+            cursor.execute("ALTER TABLE users ADD COLUMN role TEXT NOT NULL DEFAULT 'user'")
 
         cursor.execute(
             """
@@ -287,34 +628,37 @@ class AuthDatabase:
             WHERE status NOT IN ('todo', 'in_progress', 'review', 'done')
             """
         )
-        conn.commit()
 
     @staticmethod
-    def _hash_password(password: str, salt: str | None = None) -> tuple[str, str]:
-        salt = salt or secrets.token_hex(32)
-        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("utf-8"), 100000)
-        return digest.hex(), salt
+    def _pbkdf2_hash(password: str, salt: str) -> str:
+        return _pbkdf2_hash(password, salt)
+
+    @staticmethod
+    def _hash_password(password: str) -> tuple[str, str]:
+        return _run_kdf(_hash_password, password)
+
+    @staticmethod
+    def _verify_password(password: str, stored_hash: str, salt: str) -> bool:
+        return _run_kdf(_verify_password, password, stored_hash, salt)
 
     def create_user(self, username: str, password: str, role: str = "user") -> dict:
         try:
             password_hash, salt = self._hash_password(password)
-            conn = self._connect()
-            cursor = conn.cursor()
-            if self.is_postgres:
-                cursor.execute(
-                    "INSERT INTO users (username, password_hash, salt, role) VALUES (?, ?, ?, ?) RETURNING id",
-                    (username, password_hash, salt, role),
-                )
-                row = cursor.fetchone()
-                user_id = row[0] if row else None
-            else:
-                cursor.execute(
-                    "INSERT INTO users (username, password_hash, salt, role) VALUES (?, ?, ?, ?)",
-                    (username, password_hash, salt, role),
-                )
-                user_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                if self.is_postgres:
+                    cursor.execute(
+                        "INSERT INTO users (username, password_hash, salt, role) VALUES (?, ?, ?, ?) RETURNING id",
+                        (username, password_hash, salt, role),
+                    )
+                    row = cursor.fetchone()
+                    user_id = row[0] if row else None
+                else:
+                    cursor.execute(
+                        "INSERT INTO users (username, password_hash, salt, role) VALUES (?, ?, ?, ?)",
+                        (username, password_hash, salt, role),
+                    )
+                    user_id = cursor.lastrowid
             return {"success": True, "user_id": user_id, "username": username, "role": role}
         except sqlite3.IntegrityError:
             return {"success": False, "error": "Username already exists"}
@@ -323,110 +667,138 @@ class AuthDatabase:
                 return {"success": False, "error": "Username already exists"}
             return {"success": False, "error": str(exc)}
 
-    def get_user(self, username: str) -> dict:
+    def create_users_bulk(self, users: list[tuple[str, str, str]]) -> dict:
+        """Insert ``(username, password, role)`` rows in one transaction; all or nothing."""
+        if not users:
+            return {"success": True, "count": 0}
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT id, username, role, created_at, last_login, is_active FROM users WHERE username = ?",
-                (username,),
-            )
-            row = cursor.fetchone()
-            conn.close()
-            if not row:
-                return {"success": False, "error": "User not found"}
-            return {
-                "success": True,
-                "user": {
-                    "id": row[0],
-                    "username": row[1],
-                    "role": row[2],
-                    "created_at": row[3],
-                    "last_login": row[4],
-                    "is_active": row[5],
-                },
-            }
+            hashed = _hash_passwords([password for _, password, _ in users])
+            rows = [
+                (username, password_hash, salt, role)
+                for (username, _, role), (password_hash, salt) in zip(users, hashed)
+            ]
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
+                    "INSERT INTO users (username, password_hash, salt, role) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+            return {"success": True, "count": len(rows)}
+        except sqlite3.IntegrityError:
+            return {"success": False, "error": "Username already exists"}
         except Exception as exc:  # pylint: disable=broad-except
+            if self._is_unique_violation(exc):
+                return {"success": False, "error": "Username already exists"}
             return {"success": False, "error": str(exc)}
 
+    def get_user(self, username: str) -> dict:
+        return self._get_user_cached(("username", username), "username", username)
+
     def get_user_by_id(self, user_id: int) -> dict:
+        return self._get_user_cached(("id", user_id), "id", user_id)
+
+    def _get_user_cached(self, cache_key: tuple, column: str, value) -> dict:
+        cached = self._user_cache.get(cache_key)
+        if cached is not None:
+            return {"success": True, "user": dict(cached)}
+        generation = self._user_cache.generation
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT id, username, role, created_at, last_login, is_active FROM users WHERE id = ?",
-                (user_id,),
-            )
-            row = cursor.fetchone()
-            conn.close()
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"SELECT id, username, role, created_at, last_login, is_active FROM users WHERE {column} = ?",
+                    (value,),
+                )
+                row = cursor.fetchone()
             if not row:
                 return {"success": False, "error": "User not found"}
-            return {
-                "success": True,
-                "user": {
-                    "id": row[0],
-                    "username": row[1],
-                    "role": row[2],
-                    "created_at": row[3],
-                    "last_login": row[4],
-                    "is_active": row[5],
-                },
+            user = {
+                "id": row[0],
+                "username": row[1],
+                "role": row[2],
+                "created_at": row[3],
+                "last_login": row[4],
+                "is_active": row[5],
             }
+            self._user_cache.set(("username", user["username"]), user, generation)
+            self._user_cache.set(("id", user["id"]), user, generation)
+            return {"success": True, "user": dict(user)}
         except Exception as exc:  # pylint: disable=broad-except
             return {"success": False, "error": str(exc)}
 
-    def verify_user(self, username: str, password: str) -> dict:
-        try:
-            conn = self._connect()
+    def _fetch_credentials(self, username: str):
+        with self._conn() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "SELECT id, password_hash, salt, role, is_active FROM users WHERE username = ?",
                 (username,),
             )
-            row = cursor.fetchone()
-            conn.close()
+            return cursor.fetchone()
 
-            if not row:
-                return {"success": False, "error": "Invalid username or password"}
+    def _check_credentials(self, row, username: str, password: str) -> dict:
+        user_id, stored_hash, salt, role, is_active = row
+        if not is_active:
+            return {"success": False, "error": "Account is disabled"}
 
-            user_id, stored_hash, salt, role, is_active = row
-            if not is_active:
-                return {"success": False, "error": "Account is disabled"}
+        if not self._verify_password(password, stored_hash, salt):
+            return {"success": False, "error": "Invalid username or password"}
 
-            calculated_hash, _ = self._hash_password(password, salt)
-            if not hmac.compare_digest(calculated_hash, stored_hash):
-                return {"success": False, "error": "Invalid username or password"}
+        # Upgrade legacy PBKDF2 rows (and Argon2 rows with outdated parameters) while the plaintext is at hand.
+        new_credentials = self._hash_password(password) if _needs_rehash(stored_hash) else None
+        self._update_last_login(user_id, username, new_credentials)
+        return {"success": True, "user_id": user_id, "username": username, "role": role}
 
-            self._update_last_login(user_id)
-            return {"success": True, "user_id": user_id, "username": username, "role": role}
+    def verify_user(self, username: str, password: str) -> dict:
+        try:
+            row = self._fetch_credentials(username)
+            if not row:
+                return {"success": False, "error": "Invalid username or password"}
+            return self._check_credentials(row, username, password)
         except Exception as exc:  # pylint: disable=broad-except
             return {"success": False, "error": str(exc)}
 
-    def get_or_create_user(self, username: str, password: str) -> dict:
-        user = self.get_user(username)
-        if user.get("success"):
-            verified = self.verify_user(username, password)
-            if not verified.get("success"):
-                return {"success": False, "error": verified.get("error", "Invalid password")}
-            return {
-                "success": True,
-                "user_id": user["user"]["id"],
-                "username": username,
-                "role": user["user"]["role"],
-                "is_new": False,
-            }
+    def get_or_create_user(self, username: str, password: str, role: str = "user") -> dict:
+        try:
+            row = self._fetch_credentials(username)
+            if row is None:
+                password_hash, salt = self._hash_password(password)
+                with self._conn() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(
+                        """
+                        INSERT INTO users (username, password_hash, salt, role) VALUES (?, ?, ?, ?)
+                        ON CONFLICT (username) DO NOTHING
+                        RETURNING id
+                        """,
+                        (username, password_hash, salt, role),
+                    )
+                    inserted = cursor.fetchone()
+                if inserted:
+                    return {"success": True, "user_id": inserted[0], "username": username, "role": role, "is_new": True}
+                # A concurrent request created the user between the SELECT and the INSERT.
+                row = self._fetch_credentials(username)
+                if row is None:
+                    return {"success": False, "error": "Invalid username or password"}
 
-        created = self.create_user(username, password)
-        if created.get("success"):
-            created["is_new"] = True
-        return created
+            verified = self._check_credentials(row, username, password)
+            if verified.get("success"):
+                verified["is_new"] = False
+            return verified
+        except Exception as exc:  # pylint: disable=broad-except
+            return {"success": False, "error": str(exc)}
 
-    def _update_last_login(self, user_id: int) -> None:
-        conn = self._connect()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?", (user_id,))
-        conn.commit()
-        conn.close()
+    def _update_last_login(self, user_id: int, username: str, new_credentials: tuple[str, str] | None = None) -> None:
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            if new_credentials is None:
+                cursor.execute("UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?", (user_id,))
+            else:
+                cursor.execute(
+                    "UPDATE users SET password_hash = ?, salt = ?, last_login = CURRENT_TIMESTAMP WHERE id = ?",
+                    (*new_credentials, user_id),
+                )
+        self._user_cache.pop(("id", user_id))
+        self._user_cache.pop(("username", username))
 
     def log_login_attempt(
         self,
@@ -436,18 +808,31 @@ class AuthDatabase:
         ip_address: str | None = None,
     ) -> dict:
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO login_attempts (username, success, risk_score, ip_address) VALUES (?, ?, ?, ?)",
-                (username, success, risk_score, ip_address),
-            )
-            conn.commit()
-            conn.close()
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "INSERT INTO login_attempts (username, success, risk_score, ip_address) VALUES (?, ?, ?, ?)",
+                    (username, success, risk_score, ip_address),
+                )
             return {"success": True}
         except Exception as exc:  # pylint: disable=broad-except
             return {"success": False, "error": str(exc)}
 
+    def log_login_attempts_bulk(self, rows: list[tuple]) -> dict:
+        """Insert ``(username, success, risk_score, ip_address)`` rows in one transaction."""
+        if not rows:
+            return {"success": True, "count": 0}
+        try:
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
+                    "INSERT INTO login_attempts (username, success, risk_score, ip_address) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+            return {"success": True, "count": len(rows)}
+        except Exception as exc:  # pylint: disable=broad-except
+            return {"success": False, "error": str(exc)}
+
     def block_user(
         self,
         username: str,
@@ -456,31 +841,30 @@ class AuthDatabase:
         reason: str,
     ) -> dict:
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            cursor.execute("UPDATE users SET is_active = ? WHERE username = ?", (False, username))
-            user_updated = cursor.rowcount > 0
-            cursor.execute(
-                """
-                INSERT INTO security_events (username, session_id, risk_score, event_type, reason)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (username, session_id, risk_score, "ANOMALY_BLOCK", reason),
-            )
-            conn.commit()
-            conn.close()
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute("UPDATE users SET is_active = ? WHERE username = ?", (False, username))
+                user_updated = cursor.rowcount > 0
+                cursor.execute(
+                    """
+                    INSERT INTO security_events (username, session_id, risk_score, event_type, reason)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (username, session_id, risk_score, "ANOMALY_BLOCK", reason),
+                )
+            # Only the username is known here, so drop every cached row rather than leave a stale id entry.
+            self._user_cache.clear()
             return {"success": True, "user_updated": user_updated}
         except Exception as exc:  # pylint: disable=broad-except
             return {"success": False, "error": str(exc)}
 
     def set_user_role(self, username: str, role: str) -> dict:
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            cursor.execute("UPDATE users SET role = ? WHERE username = ?", (role, username))
-            updated = cursor.rowcount > 0
-            conn.commit()
-            conn.close()
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute("UPDATE users SET role = ? WHERE username = ?", (role, username))
+                updated = cursor.rowcount > 0
+            self._user_cache.clear()
             if not updated:
                 return {"success": False, "error": "User not found"}
             return {"success": True, "username": username, "role": role}
@@ -496,48 +880,63 @@ class AuthDatabase:
         risk_score: float | None = None,
     ) -> dict:
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO security_events (username, session_id, risk_score, event_type, reason)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (username, session_id, risk_score, event_type, reason),
-            )
-            conn.commit()
-            conn.close()
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    INSERT INTO security_events (username, session_id, risk_score, event_type, reason)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (username, session_id, risk_score, event_type, reason),
+                )
             return {"success": True}
         except Exception as exc:  # pylint: disable=broad-except
             return {"success": False, "error": str(exc)}
 
-    def get_security_events(self, limit: int = 100, username: str | None = None) -> dict:
+    def log_security_events_bulk(self, rows: list[tuple]) -> dict:
+        """Insert ``(username, session_id, risk_score, event_type, reason)`` rows in one transaction."""
+        if not rows:
+            return {"success": True, "count": 0}
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            if username:
-                cursor.execute(
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
                     """
-                    SELECT username, session_id, risk_score, event_type, reason, timestamp
-                    FROM security_events
-                    WHERE username = ?
-                    ORDER BY timestamp DESC
-                    LIMIT ?
-                    """,
-                    (username, limit),
-                )
-            else:
-                cursor.execute(
-                    """
-                    SELECT username, session_id, risk_score, event_type, reason, timestamp
-                    FROM security_events
-                    ORDER BY timestamp DESC
-                    LIMIT ?
+                    INSERT INTO security_events (username, session_id, risk_score, event_type, reason)
+                    VALUES (?, ?, ?, ?, ?)
                     """,
-                    (limit,),
+                    rows,
                 )
-            rows = cursor.fetchall()
-            conn.close()
+            return {"success": True, "count": len(rows)}
+        except Exception as exc:  # pylint: disable=broad-except
+            return {"success": False, "error": str(exc)}
+
+    def get_security_events(self, limit: int = 100, username: str | None = None) -> dict:
+        try:
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                if username:
+                    cursor.execute(
+                        """
+                        SELECT username, session_id, risk_score, event_type, reason, timestamp
+                        FROM security_events
+                        WHERE username = ?
+                        ORDER BY timestamp DESC
+                        LIMIT ?
+                        """,
+                        (username, limit),
+                    )
+                else:
+                    cursor.execute(
+                        """
+                        SELECT username, session_id, risk_score, event_type, reason, timestamp
+                        FROM security_events
+                        ORDER BY timestamp DESC
+                        LIMIT ?
+                        """,
+                        (limit,),
+                    )
+                rows = cursor.fetchall()
             return {
                 "success": True,
                 "events": [
@@ -557,48 +956,45 @@ class AuthDatabase:
 
     def create_project(self, owner_id: int, name: str, description: str | None = None) -> dict:
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            if self.is_postgres:
-                cursor.execute(
-                    """
-                    INSERT INTO projects (owner_id, name, description)
-                    VALUES (?, ?, ?) RETURNING id
-                    """,
-                    (owner_id, name, description),
-                )
-                row = cursor.fetchone()
-                project_id = row[0] if row else None
-            else:
-                cursor.execute(
-                    """
-                    INSERT INTO projects (owner_id, name, description)
-                    VALUES (?, ?, ?)
-                    """,
-                    (owner_id, name, description),
-                )
-                project_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                if self.is_postgres:
+                    cursor.execute(
+                        """
+                        INSERT INTO projects (owner_id, name, description)
+                        VALUES (?, ?, ?) RETURNING id
+                        """,
+                        (owner_id, name, description),
+                    )
+                    row = cursor.fetchone()
+                    project_id = row[0] if row else None
+                else:
+                    cursor.execute(
+                        """
+                        INSERT INTO projects (owner_id, name, description)
+                        VALUES (?, ?, ?)
+                        """,
+                        (owner_id, name, description),
+                    )
+                    project_id = cursor.lastrowid
             return {"success": True, "project_id": project_id}
         except Exception as exc:  # pylint: disable=broad-except
             return {"success": False, "error": str(exc)}
 
     def get_projects_for_user(self, user_id: int) -> dict:
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT id, name, description, created_at, updated_at
-                FROM projects
-                WHERE owner_id = ?
-                ORDER BY updated_at DESC, id DESC
-                """,
-                (user_id,),
-            )
-            rows = cursor.fetchall()
-            conn.close()
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT id, name, description, created_at, updated_at
+                    FROM projects
+                    WHERE owner_id = ?
+                    ORDER BY updated_at DESC, id DESC
+                    """,
+                    (user_id,),
+                )
+                rows = cursor.fetchall()
             return {
                 "success": True,
                 "projects": [
@@ -617,18 +1013,17 @@ class AuthDatabase:
 
     def get_project(self, project_id: int) -> dict:
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT id, owner_id, name, description, created_at, updated_at
-                FROM projects
-                WHERE id = ?
-                """,
-                (project_id,),
-            )
-            row = cursor.fetchone()
-            conn.close()
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT id, owner_id, name, description, created_at, updated_at
+                    FROM projects
+                    WHERE id = ?
+                    """,
+                    (project_id,),
+                )
+                row = cursor.fetchone()
             if not row:
                 return {"success": False, "error": "Project not found"}
             return {
@@ -645,6 +1040,22 @@ class AuthDatabase:
         except Exception as exc:  # pylint: disable=broad-except
             return {"success": False, "error": str(exc)}
 
+    def get_project_owner(self, project_id: int) -> dict:
+        owner_id = self._project_owner_cache.get(project_id)
+        if owner_id is not None:
+            return {"success": True, "owner_id": owner_id}
+        try:
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT owner_id FROM projects WHERE id = ?", (project_id,))
+                row = cursor.fetchone()
+            if not row:
+                return {"success": False, "error": "Project not found"}
+            self._project_owner_cache.set(project_id, row[0])
+            return {"success": True, "owner_id": row[0]}
+        except Exception as exc:  # pylint: disable=broad-except
+            return {"success": False, "error": str(exc)}
+
     def create_task(
         self,
         project_id: int,
@@ -657,57 +1068,77 @@ class AuthDatabase:
         created_by: int,
     ) -> dict:
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            if self.is_postgres:
-                cursor.execute(
-                    """
-                    INSERT INTO tasks (project_id, title, description, status, priority, assignee_id, due_date, created_by)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?) RETURNING id
-                    """,
-                    (project_id, title, description, status, priority, assignee_id, due_date, created_by),
-                )
-                row = cursor.fetchone()
-                task_id = row[0] if row else None
-            else:
-                cursor.execute(
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                if self.is_postgres:
+                    # One statement: insert the task and bump the parent project's updated_at.
+                    cursor.execute(
+                        """
+                        WITH new_task AS (
+                            INSERT INTO tasks (project_id, title, description, status, priority, assignee_id, due_date, created_by)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                            RETURNING id, project_id
+                        )
+                        UPDATE projects
+                        SET updated_at = CURRENT_TIMESTAMP
+                        FROM new_task
+                        WHERE projects.id = new_task.project_id
+                        RETURNING new_task.id
+                        """,
+                        (project_id, title, description, status, priority, assignee_id, due_date, created_by),
+                    )
+                    row = cursor.fetchone()
+                    task_id = row[0] if row else None
+                else:
+                    # The tasks_touch_project trigger bumps projects.updated_at.
+                    cursor.execute(
+                        """
+                        INSERT INTO tasks (project_id, title, description, status, priority, assignee_id, due_date, created_by)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (project_id, title, description, status, priority, assignee_id, due_date, created_by),
+                    )
+                    task_id = cursor.lastrowid
+            return {"success": True, "task_id": task_id}
+        except Exception as exc:  # pylint: disable=broad-except
+            return {"success": False, "error": str(exc)}
+
+    def create_tasks_bulk(self, project_id: int, tasks: list[tuple], created_by: int) -> dict:
+        """Insert ``(title, description, status, priority, assignee_id, due_date)`` rows in one transaction."""
+        if not tasks:
+            return {"success": True, "count": 0}
+        try:
+            rows = [(project_id, *task, created_by) for task in tasks]
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
                     """
                     INSERT INTO tasks (project_id, title, description, status, priority, assignee_id, due_date, created_by)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                     """,
-                    (project_id, title, description, status, priority, assignee_id, due_date, created_by),
+                    rows,
                 )
-                task_id = cursor.lastrowid
-            cursor.execute(
-                """
-                UPDATE projects
-                SET updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-                """,
-                (project_id,),
-            )
-            conn.commit()
-            conn.close()
-            return {"success": True, "task_id": task_id}
+                if self.is_postgres:
+                    cursor.execute("UPDATE projects SET updated_at = CURRENT_TIMESTAMP WHERE id = ?", (project_id,))
+            return {"success": True, "count": len(rows)}
         except Exception as exc:  # pylint: disable=broad-except
             return {"success": False, "error": str(exc)}
 
     def get_tasks_for_project(self, project_id: int) -> dict:
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT t.id, t.title, t.description, t.status, t.priority, t.assignee_id, u.username, t.due_date, t.created_by, t.created_at, t.updated_at
-                FROM tasks t
-                LEFT JOIN users u ON t.assignee_id = u.id
-                WHERE t.project_id = ?
-                ORDER BY t.updated_at DESC, t.id DESC
-                """,
-                (project_id,),
-            )
-            rows = cursor.fetchall()
-            conn.close()
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT t.id, t.title, t.description, t.status, t.priority, t.assignee_id, u.username, t.due_date, t.created_by, t.created_at, t.updated_at
+                    FROM tasks t
+                    LEFT JOIN users u ON t.assignee_id = u.id
+                    WHERE t.project_id = ?
+                    ORDER BY t.updated_at DESC, t.id DESC
+                    """,
+                    (project_id,),
+                )
+                rows = cursor.fetchall()
             return {
                 "success": True,
                 "tasks": [
@@ -732,18 +1163,17 @@ class AuthDatabase:
 
     def get_task(self, task_id: int) -> dict:
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT id, project_id, title, description, status, priority, assignee_id, due_date, created_by
-                FROM tasks
-                WHERE id = ?
-                """,
-                (task_id,),
-            )
-            row = cursor.fetchone()
-            conn.close()
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT id, project_id, title, description, status, priority, assignee_id, due_date, created_by
+                    FROM tasks
+                    WHERE id = ?
+                    """,
+                    (task_id,),
+                )
+                row = cursor.fetchone()
             if not row:
                 return {"success": False, "error": "Task not found"}
             return {
@@ -774,37 +1204,36 @@ class AuthDatabase:
         due_date: str | None = None,
     ) -> dict:
         try:
-            current = self.get_task(task_id)
-            if not current.get("success"):
-                return current
-            task = current["task"]
-            next_title = title if title is not None else task["title"]
-            next_description = description if description is not None else task["description"]
-            next_status = status if status is not None else task["status"]
-            next_priority = priority if priority is not None else task["priority"]
-            next_assignee = assignee_id if assignee_id is not None else task["assignee_id"]
-            next_due_date = due_date if due_date is not None else task["due_date"]
-
-            conn = self._connect()
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                UPDATE tasks
-                SET title = ?, description = ?, status = ?, priority = ?, assignee_id = ?, due_date = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-                """,
-                (next_title, next_description, next_status, next_priority, next_assignee, next_due_date, task_id),
-            )
-            cursor.execute(
-                """
-                UPDATE projects
-                SET updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-                """,
-                (task["project_id"],),
-            )
-            conn.commit()
-            conn.close()
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                # COALESCE keeps the stored value for fields the caller left as None,
+                # so the merge happens in the UPDATE instead of after a read.
+                cursor.execute(
+                    """
+                    UPDATE tasks
+                    SET title = COALESCE(?, title),
+                        description = COALESCE(?, description),
+                        status = COALESCE(?, status),
+                        priority = COALESCE(?, priority),
+                        assignee_id = COALESCE(?, assignee_id),
+                        due_date = COALESCE(?, due_date),
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                    RETURNING project_id
+                    """,
+                    (title, description, status, priority, assignee_id, due_date, task_id),
+                )
+                row = cursor.fetchone()
+                if not row:
+                    return {"success": False, "error": "Task not found"}
+                cursor.execute(
+                    """
+                    UPDATE projects
+                    SET updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                    """,
+                    (row[0],),
+                )
             return {"success": True}
         except Exception as exc:  # pylint: disable=broad-except
             return {"success": False, "error": str(exc)}
@@ -818,56 +1247,47 @@ class AuthDatabase:
         risk_score: float,
     ) -> dict:
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT keystroke_data, mouse_data FROM behavioral_profiles WHERE session_id = ?",
-                (session_id,),
-            )
-            existing = cursor.fetchone()
-            if existing:
-                existing_keystrokes = json.loads(existing[0] or "[]")
-                existing_mouse = json.loads(existing[1] or "[]")
-                existing_keystrokes.extend(keystroke_data or [])
-                existing_mouse.extend(mouse_data or [])
-                cursor.execute(
-                    """
-                    UPDATE behavioral_profiles
-                    SET keystroke_data = ?, mouse_data = ?, risk_score = ?, timestamp = CURRENT_TIMESTAMP
-                    WHERE session_id = ?
-                    """,
-                    (json.dumps(existing_keystrokes), json.dumps(existing_mouse), risk_score, session_id),
-                )
-            else:
+            with self._conn() as conn:
+                cursor = conn.cursor()
                 cursor.execute(
                     """
-                    INSERT INTO behavioral_profiles (user_id, session_id, keystroke_data, mouse_data, risk_score)
-                    VALUES (?, ?, ?, ?, ?)
+                    INSERT INTO behavioral_profiles (user_id, session_id, risk_score)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT (session_id) DO UPDATE
+                    SET risk_score = excluded.risk_score, timestamp = CURRENT_TIMESTAMP
+                    RETURNING id
                     """,
-                    (user_id, session_id, json.dumps(keystroke_data or []), json.dumps(mouse_data or []), risk_score),
+                    (user_id, session_id, risk_score),
                 )
-            conn.commit()
-            conn.close()
+                profile_id = cursor.fetchone()[0]
+
+                # Events are appended as child rows so a session never rewrites its history.
+                events = [(profile_id, "keystroke", _encode_event(event)) for event in keystroke_data or []]
+                events.extend((profile_id, "mouse", _encode_event(event)) for event in mouse_data or [])
+                if events:
+                    cursor.executemany(
+                        "INSERT INTO behavioral_events (profile_id, kind, payload) VALUES (?, ?, ?)",
+                        events,
+                    )
             return {"success": True}
         except Exception as exc:  # pylint: disable=broad-except
             return {"success": False, "error": str(exc)}
 
     def get_behavioral_history(self, user_id: int, limit: int) -> dict:
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT session_id, risk_score, timestamp
-                FROM behavioral_profiles
-                WHERE user_id = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-                """,
-                (user_id, limit),
-            )
-            rows = cursor.fetchall()
-            conn.close()
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT session_id, risk_score, timestamp
+                    FROM behavioral_profiles
+                    WHERE user_id = ?
+                    ORDER BY timestamp DESC
+                    LIMIT ?
+                    """,
+                    (user_id, limit),
+                )
+                rows = cursor.fetchall()
             return {
                 "success": True,
                 "history": [
@@ -880,33 +1300,67 @@ class AuthDatabase:
 
     def get_behavioral_training_data(self, limit: int = 5000) -> dict:
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            active_filter = "TRUE" if self.is_postgres else "1"
-            cursor.execute(
-                f"""
-                SELECT u.username, b.keystroke_data, b.mouse_data
-                FROM behavioral_profiles b
-                JOIN users u ON u.id = b.user_id
-                WHERE u.is_active = {active_filter}
-                ORDER BY b.timestamp DESC
-                LIMIT ?
-                """,
-                (limit,),
-            )
-            rows = cursor.fetchall()
-            conn.close()
-            dataset = []
-            for row in rows:
-                dataset.append(
-                    {
-                        "user_id": row[0],
-                        "behavioral_data": {
-                            "keystrokeData": json.loads(row[1] or "[]"),
-                            "mouseData": json.loads(row[2] or "[]"),
-                        },
-                    }
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                active_filter = "TRUE" if self.is_postgres else "1"
+                recent_profiles = f"""
+                    SELECT b.id
+                    FROM behavioral_profiles b
+                    JOIN users u ON u.id = b.user_id
+                    WHERE u.is_active = {active_filter}
+                    ORDER BY b.timestamp DESC
+                    LIMIT ?
+                """
+                cursor.execute(
+                    f"""
+                    SELECT b.id, u.username, b.keystroke_data, b.mouse_data
+                    FROM behavioral_profiles b
+                    JOIN users u ON u.id = b.user_id
+                    WHERE b.id IN ({recent_profiles})
+                    ORDER BY b.timestamp DESC
+                    """,
+                    (limit,),
                 )
+                # Decode while iterating the cursor so the raw JSON text of every row is
+                # never held alongside the decoded dataset.
+                dataset = []
+                by_profile = {}
+                for profile_id, username, keystroke_data, mouse_data in cursor:
+                    # Profiles written before behavioral_events existed keep their JSON blobs;
+                    # newer ones leave the columns NULL and need no parse at all.
+                    behavioral_data = {
+                        "keystrokeData": orjson.loads(keystroke_data) if keystroke_data else [],
+                        "mouseData": orjson.loads(mouse_data) if mouse_data else [],
+                    }
+                    by_profile[profile_id] = behavioral_data
+                    dataset.append({"user_id": username, "behavioral_data": behavioral_data})
+                # Concatenate each profile's payloads into one JSON array in SQL, so
+                # Python decodes once per (profile, kind) rather than once per event.
+                if self.is_postgres:
+                    events_query = f"""
+                        SELECT profile_id, kind, '[' || string_agg(payload, ',' ORDER BY id) || ']'
+                        FROM behavioral_events
+                        WHERE profile_id IN ({recent_profiles})
+                        GROUP BY profile_id, kind
+                    """
+                else:
+                    events_query = f"""
+                        SELECT profile_id, kind, '[' || group_concat(payload, ',') || ']'
+                        FROM (
+                            SELECT profile_id, kind, payload
+                            FROM behavioral_events
+                            WHERE profile_id IN ({recent_profiles})
+                            ORDER BY id
+                        )
+                        GROUP BY profile_id, kind
+                    """
+                cursor.execute(events_query, (limit,))
+                for profile_id, kind, payloads in cursor:
+                    behavioral_data = by_profile.get(profile_id)
+                    if behavioral_data is None:
+                        continue
+                    key = "keystrokeData" if kind == "keystroke" else "mouseData"
+                    behavioral_data[key].extend(orjson.loads(payloads))
             return {"success": True, "dataset": dataset}
         except Exception as exc:  # pylint: disable=broad-except
             return {"success": False, "error": str(exc)}
@@ -924,9 +1378,24 @@ class AuthDatabase:
         return int(user["user"].get("is_active", 1)) == 0
 
 
-@lru_cache
+_get_db_lock = threading.Lock()
+
+
 def get_db() -> AuthDatabase:
+    # lru_cache alone lets two first callers race and each build a pool; only one would be kept.
+    with _get_db_lock:
+        return _open_db()
+
+
+@lru_cache
+def _open_db() -> AuthDatabase:
     from app.config import get_settings
 
     settings = get_settings()
-    return AuthDatabase(settings.database_url or settings.db_path)
+    prepare_threshold = settings.database_prepare_threshold
+    return AuthDatabase(
+        settings.database_url or settings.db_path,
+        # A negative threshold disables server-side prepares (PgBouncer in transaction mode).
+        pg_prepare_threshold=None if prepare_threshold < 0 else prepare_threshold,
+        pg_pool_size=settings.database_pool_size,
+    )
@@ -0,0 +1,54 @@
+import logging
+import logging.handlers
+import queue
+
+# uvicorn attaches its handlers to these loggers; the app's own loggers propagate to root.
+_QUEUED_LOGGERS = ("", "uvicorn.error", "uvicorn.access")
+
+
+class _RecordQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue the record untouched.
+
+    The stock prepare() formats the message and clears ``args``, which breaks
+    formatters that read ``record.args`` themselves (uvicorn's AccessFormatter).
+    The listener's handlers format the record on their own thread anyway.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_installed: list[tuple[logging.Logger, logging.Handler, logging.handlers.QueueListener]] = []
+
+
+def start_queue_logging() -> None:
+    """Move the configured handlers behind a QueueHandler per logger.
+
+    Request threads and the event loop then only enqueue records; formatting and
+    stream/file I/O happen on each QueueListener's background thread.
+    """
+    if _installed:
+        return
+    for name in _QUEUED_LOGGERS:
+        logger = logging.getLogger(name)
+        handlers = [h for h in logger.handlers if not isinstance(h, logging.handlers.QueueHandler)]
+        if not handlers:
+            continue
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        for handler in handlers:
+            logger.removeHandler(handler)
+        queue_handler = _RecordQueueHandler(records)
+        logger.addHandler(queue_handler)
+        listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        listener.start()
+        _installed.append((logger, queue_handler, listener))
+
+
+def stop_queue_logging() -> None:
+    """Flush queued records and put the original handlers back."""
+    while _installed:
+        logger, queue_handler, listener = _installed.pop()
+        listener.stop()
+        logger.removeHandler(queue_handler)
+        for handler in listener.handlers:
+            logger.addHandler(handler)
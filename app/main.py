@@ -1,18 +1,30 @@
 import asyncio
+from contextvars import ContextVar
 from datetime import datetime, timezone
+from functools import cache
 from pathlib import Path
+from uuid import uuid4
 
+import anyio.to_thread
+import httpx
+import orjson
 from fastapi import APIRouter, Depends, FastAPI, File, Header, HTTPException, Query, Request, UploadFile, WebSocket, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 
 from app.config import get_settings
-from app.database import get_db
+from app.database import configure_password_hash_pool, get_db, shutdown_password_hash_pool
 from app.realtime import RealtimeBehaviorService
-from app.alerts import send_security_alert
+from app.alerts import close_alert_client, dispatch_security_alert
+from app.audit import AuditLogBuffer
+from app.logging_config import start_queue_logging, stop_queue_logging
 from app.security import create_access_token, verify_access_token
+from app.throttle import LoginFailureLimiter
 from app.schemas import (
+    BatchPayload,
     BehavioralHistoryResult,
     BehavioralProfilePayload,
     Credentials,
@@ -25,14 +37,41 @@ from app.schemas import (
     UserResult,
 )
 
+UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
 settings = get_settings()
 db = get_db()
-realtime_service = RealtimeBehaviorService(settings, db)
-app = FastAPI(title=settings.app_name)
+audit_log = AuditLogBuffer(db)
+realtime_service = RealtimeBehaviorService(settings, db, audit_log)
+login_limiter = LoginFailureLimiter(settings.login_max_failures, settings.login_failure_window_seconds)
+app = FastAPI(title=settings.app_name, default_response_class=ORJSONResponse)
 router = APIRouter()
 
+# Settings are fixed for the life of the process, so the health body is rendered once.
+_HEALTH_BODY = orjson.dumps({"status": "healthy", "service": settings.app_name, "environment": settings.app_env})
+
+# Health checks from load balancers and probes carry no Origin header, so CORS has
+# nothing to add; the stock middleware would still wrap send and add a Vary header.
+_HEALTH_PATHS = frozenset(f"{prefix}/health" for prefix in ("", "/api", "/api/v1"))
+
+
+class _ProbeBypassCORSMiddleware(CORSMiddleware):
+    async def __call__(self, scope, receive, send) -> None:
+        if (
+            scope["type"] == "http"
+            and scope["path"] in _HEALTH_PATHS
+            and not any(name == b"origin" for name, _ in scope["headers"])
+        ):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Registered before CORS so it sits inside it; bodies under 1 KiB are sent as-is.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 app.add_middleware(
-    CORSMiddleware,
+    _ProbeBypassCORSMiddleware,
     allow_origins=settings.allowed_origins,
     allow_credentials=True,
     allow_methods=["*"],
@@ -40,13 +79,14 @@ app.add_middleware(
 )
 
 
-def route_aliases(paths: list[str], **kwargs):
-    def decorator(func):
-        for path in paths:
-            router.add_api_route(path, func, **kwargs)
-        return func
-
-    return decorator
+def _ensure_login_not_throttled(username: str) -> None:
+    retry_after = login_limiter.retry_after(username)
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many failed login attempts. Try again later.",
+            headers={"Retry-After": str(int(retry_after) + 1)},
+        )
 
 
 def _is_blocked_error(message: str | None) -> bool:
@@ -54,13 +94,13 @@ def _is_blocked_error(message: str | None) -> bool:
     return "disabled" in text or "blocked" in text
 
 
-def _ensure_username_not_blocked(username: str) -> None:
-    if db.is_user_blocked(username):
+async def _ensure_username_not_blocked(username: str) -> None:
+    if await run_in_threadpool(db.is_user_blocked, username):
         raise HTTPException(status_code=403, detail="Account is blocked due to behavioral anomaly detection.")
 
 
-def _ensure_user_id_not_blocked(user_id: int) -> None:
-    if db.is_user_id_blocked(user_id):
+async def _ensure_user_id_not_blocked(user_id: int) -> None:
+    if await run_in_threadpool(db.is_user_id_blocked, user_id):
         raise HTTPException(status_code=403, detail="Account is blocked due to behavioral anomaly detection.")
 
 
@@ -76,14 +116,16 @@ def _parse_bearer_token(authorization: str | None) -> str:
     return token
 
 
-async def get_current_principal(authorization: str | None = Header(default=None, alias="Authorization")) -> dict:
-    token = _parse_bearer_token(authorization)
+async def get_current_principal(request: Request) -> dict:
+    # Read the header directly rather than through a Header() parameter, which adds
+    # a validation pass to every authenticated request.
+    token = _parse_bearer_token(request.headers.get("authorization"))
     try:
         claims = verify_access_token(token, settings)
     except ValueError as exc:
         raise HTTPException(status_code=401, detail=str(exc)) from exc
 
-    user = db.get_user(claims["sub"])
+    user = await run_in_threadpool(db.get_user, claims["sub"])
     if not user.get("success"):
         raise HTTPException(status_code=401, detail="User no longer exists")
     if int(user["user"].get("is_active", 1)) == 0:
@@ -105,79 +147,94 @@ def require_roles(*roles: str):
     return _role_dependency
 
 
-def _ensure_project_access(principal: dict, project_id: int) -> dict:
-    project = db.get_project(project_id)
+async def _ensure_project_access(principal: dict, project_id: int) -> None:
+    project = await run_in_threadpool(db.get_project_owner, project_id)
     if not project.get("success"):
         raise HTTPException(status_code=404, detail=project.get("error", "Project not found"))
-    if principal["role"] not in {"analyst", "admin"} and project["project"]["owner_id"] != principal["user_id"]:
+    if principal["role"] not in {"analyst", "admin"} and project["owner_id"] != principal["user_id"]:
         raise HTTPException(status_code=403, detail="Cannot access another user's project")
-    return project["project"]
 
 
-@route_aliases(["/health", "/api/health", "/api/v1/health"], methods=["GET"], tags=["health"])
-async def health() -> dict:
-    return {"status": "healthy", "service": settings.app_name, "environment": settings.app_env}
+@router.get("/health", tags=["health"])
+async def health() -> Response:
+    # A fresh Response per request: middleware appends to the header list of the instance it sends.
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
-@route_aliases(["/security-events", "/api/security-events", "/api/v1/security-events"], methods=["GET"], tags=["security"])
+@router.get("/security-events", tags=["security"])
 async def get_security_events(
     limit: int = Query(default=50, ge=1, le=500),
     username: str | None = Query(default=None),
     principal: dict = Depends(require_roles("analyst", "admin")),
 ) -> dict:
-    result = db.get_security_events(limit=limit, username=username)
+    # Analysts should see events that are still sitting in the write buffer.
+    await audit_log.flush()
+    result = await run_in_threadpool(db.get_security_events, limit=limit, username=username)
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error", "Failed to fetch security events"))
     result["requested_by"] = principal["username"]
     return result
 
 
-@route_aliases(
-    ["/realtime-monitor", "/api/realtime-monitor", "/api/v1/realtime-monitor"],
-    methods=["GET"],
-    tags=["security"],
-)
+@router.get("/realtime-monitor", tags=["security"])
 async def realtime_monitor(principal: dict = Depends(require_roles("analyst", "admin"))) -> dict:
     snapshot = realtime_service.get_monitor_snapshot()
     snapshot["requested_by"] = principal["username"]
     return snapshot
 
 
-@route_aliases(["/upload", "/api/upload", "/api/v1/upload"], methods=["POST"], response_model=UploadResult, tags=["agent"])
-async def upload_file(file: UploadFile = File(...)) -> dict:
-    raw = await file.read()
-    if not raw:
-        raise HTTPException(status_code=400, detail="Uploaded file is empty")
-    if len(raw) > 10 * 1024 * 1024:
-        raise HTTPException(status_code=413, detail="File exceeds 10MB limit")
-
+@cache
+def _ensure_upload_dir() -> Path:
     upload_dir = Path(settings.upload_dir)
     upload_dir.mkdir(parents=True, exist_ok=True)
+    return upload_dir
+
+
+@router.post("/upload", response_model=UploadResult, tags=["agent"])
+async def upload_file(file: UploadFile = File(...)) -> dict:
+    upload_dir = _ensure_upload_dir()
     safe_name = Path(file.filename).name
     destination = upload_dir / safe_name
-    destination.write_bytes(raw)
+    # Stream into a scratch file so oversized uploads fail early and a partial write never replaces a file.
+    partial = upload_dir / f".{safe_name}.{uuid4().hex}.part"
+
+    size_bytes = 0
+    try:
+        with partial.open("wb") as handle:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                size_bytes += len(chunk)
+                if size_bytes > UPLOAD_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail="File exceeds 10MB limit")
+                await run_in_threadpool(handle.write, chunk)
+        if not size_bytes:
+            raise HTTPException(status_code=400, detail="Uploaded file is empty")
+        partial.replace(destination)
+    finally:
+        partial.unlink(missing_ok=True)
 
     return {
         "success": True,
         "filename": safe_name,
         "content_type": file.content_type or "application/octet-stream",
-        "size_bytes": len(raw),
+        "size_bytes": size_bytes,
         "stored_at": datetime.now(timezone.utc).isoformat(),
     }
 
 
-@route_aliases(
-    ["/register", "/api/register", "/api/v1/register"],
-    methods=["POST"],
-    status_code=status.HTTP_201_CREATED,
-    tags=["auth"],
-)
+def _initial_role(username: str) -> str:
+    # The configured admin gets its role when the account is created; an account that
+    # already exists is promoted once at startup by promote_initial_admin.
+    return "admin" if username == settings.initial_admin_username else "user"
+
+
+@router.post("/register", status_code=status.HTTP_201_CREATED, tags=["auth"])
 async def register(payload: Credentials) -> dict:
     if len(payload.password) < 6:
         raise HTTPException(status_code=400, detail="Password must be at least 6 characters long")
 
-    role = "admin" if payload.username == settings.initial_admin_username else "user"
-    result = db.create_user(payload.username, payload.password, role=role)
+    result = await run_in_threadpool(
+        db.create_user, payload.username, payload.password, role=_initial_role(payload.username)
+    )
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error", "Registration failed"))
 
@@ -190,18 +247,19 @@ async def register(payload: Credentials) -> dict:
     }
 
 
-@route_aliases(["/start-session", "/api/start-session", "/api/v1/start-session"], methods=["POST"], tags=["auth"])
+@router.post("/start-session", tags=["auth"])
 async def start_session(payload: Credentials) -> dict:
-    _ensure_username_not_blocked(payload.username)
-    result = db.get_or_create_user(payload.username, payload.password)
+    await _ensure_username_not_blocked(payload.username)
+    _ensure_login_not_throttled(payload.username)
+    result = await run_in_threadpool(
+        db.get_or_create_user, payload.username, payload.password, role=_initial_role(payload.username)
+    )
     if not result.get("success"):
         if _is_blocked_error(result.get("error")):
             raise HTTPException(status_code=403, detail=result.get("error", "User blocked"))
+        login_limiter.record_failure(payload.username)
         raise HTTPException(status_code=400, detail=result.get("error", "Failed to start session"))
-    if result["username"] == settings.initial_admin_username and result.get("role") != "admin":
-        db.set_user_role(result["username"], "admin")
-        result["role"] = "admin"
-
+    login_limiter.reset(payload.username)
     access_token, expires_at = create_access_token(settings, result["username"], result["user_id"])
     result["access_token"] = access_token
     result["token_type"] = "bearer"
@@ -209,21 +267,22 @@ async def start_session(payload: Credentials) -> dict:
     return result
 
 
-@route_aliases(["/login", "/api/login", "/api/v1/login"], methods=["POST"], tags=["auth"])
+@router.post("/login", tags=["auth"])
 async def login(payload: LoginPayload, request: Request) -> dict:
-    _ensure_username_not_blocked(payload.username)
-    result = db.verify_user(payload.username, payload.password)
+    await _ensure_username_not_blocked(payload.username)
+    _ensure_login_not_throttled(payload.username)
+    result = await run_in_threadpool(db.verify_user, payload.username, payload.password)
     client_ip = request.client.host if request.client else None
-    db.log_login_attempt(payload.username, int(result.get("success", False)), payload.risk_score, client_ip)
+    await audit_log.log_login_attempt(payload.username, int(result.get("success", False)), payload.risk_score, client_ip)
 
     if result.get("success") and payload.risk_score > settings.high_risk_threshold:
-        db.log_security_event(
+        await audit_log.log_security_event(
             username=payload.username,
             event_type="HIGH_RISK_LOGIN",
             reason="Risk score exceeded high risk threshold",
             risk_score=payload.risk_score,
         )
-        send_security_alert(
+        dispatch_security_alert(
             {
                 "event_type": "HIGH_RISK_LOGIN",
                 "username": payload.username,
@@ -235,11 +294,9 @@ async def login(payload: LoginPayload, request: Request) -> dict:
     if not result.get("success"):
         if _is_blocked_error(result.get("error")):
             raise HTTPException(status_code=403, detail=result.get("error", "User blocked"))
+        login_limiter.record_failure(payload.username)
         raise HTTPException(status_code=401, detail=result.get("error", "Invalid credentials"))
-
-    if result["username"] == settings.initial_admin_username and result.get("role") != "admin":
-        db.set_user_role(result["username"], "admin")
-        result["role"] = "admin"
+    login_limiter.reset(payload.username)
 
     access_token, expires_at = create_access_token(settings, result["username"], result["user_id"])
 
@@ -256,12 +313,13 @@ async def login(payload: LoginPayload, request: Request) -> dict:
     }
 
 
-@route_aliases(["/behavioral-profile", "/api/behavioral-profile", "/api/v1/behavioral-profile"], methods=["POST"], tags=["auth"])
+@router.post("/behavioral-profile", tags=["auth"])
 async def save_behavioral_profile(payload: BehavioralProfilePayload, principal: dict = Depends(get_current_principal)) -> dict:
     if principal["user_id"] != payload.user_id and principal["role"] != "admin":
         raise HTTPException(status_code=403, detail="Cannot write another user's behavioral profile")
-    _ensure_user_id_not_blocked(payload.user_id)
-    result = db.save_behavioral_profile(
+    await _ensure_user_id_not_blocked(payload.user_id)
+    result = await run_in_threadpool(
+        db.save_behavioral_profile,
         payload.user_id,
         payload.session_id,
         payload.keystroke_data,
@@ -273,50 +331,39 @@ async def save_behavioral_profile(payload: BehavioralProfilePayload, principal:
     return {"success": True, "message": "Behavioral profile saved successfully"}
 
 
-@route_aliases(["/user/{username}", "/api/user/{username}", "/api/v1/user/{username}"], methods=["GET"], response_model=UserResult, tags=["auth"])
-async def get_user(username: str, principal: dict = Depends(get_current_principal)) -> dict:
+@router.get("/user/{username}", response_model=UserResult, tags=["auth"])
+async def get_user(username: str, principal: dict = Depends(get_current_principal)) -> ORJSONResponse:
     if principal["username"] != username and principal["role"] not in {"analyst", "admin"}:
         raise HTTPException(status_code=403, detail="Cannot read another user's profile")
-    result = db.get_user(username)
+    result = await run_in_threadpool(db.get_user, username)
     if not result.get("success"):
         raise HTTPException(status_code=404, detail=result.get("error", "User not found"))
-    return result
+    # Validate once here, which also drops any user column UserInfo does not list,
+    # and return the response directly so FastAPI does not validate it again.
+    return ORJSONResponse(UserResult.model_validate(result).model_dump())
 
 
-@route_aliases(
-    [
-        "/user/{user_id}/behavioral-history",
-        "/api/user/{user_id}/behavioral-history",
-        "/api/v1/user/{user_id}/behavioral-history",
-    ],
-    methods=["GET"],
-    response_model=BehavioralHistoryResult,
-    tags=["auth"],
-)
+@router.get("/user/{user_id}/behavioral-history", response_model=BehavioralHistoryResult, tags=["auth"])
 async def behavioral_history(user_id: int, limit: int = Query(default=10, ge=1), principal: dict = Depends(get_current_principal)) -> dict:
     if principal["user_id"] != user_id and principal["role"] not in {"analyst", "admin"}:
         raise HTTPException(status_code=403, detail="Cannot read another user's behavioral history")
     bounded_limit = min(limit, settings.max_behavior_history_limit)
-    result = db.get_behavioral_history(user_id, bounded_limit)
+    result = await run_in_threadpool(db.get_behavioral_history, user_id, bounded_limit)
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error", "Failed to fetch behavioral history"))
     return result
 
 
-@route_aliases(
-    ["/admin/users/{username}/role", "/api/admin/users/{username}/role", "/api/v1/admin/users/{username}/role"],
-    methods=["POST"],
-    tags=["security"],
-)
+@router.post("/admin/users/{username}/role", tags=["security"])
 async def update_user_role(
     username: str,
     payload: RoleUpdatePayload,
     principal: dict = Depends(require_roles("admin")),
 ) -> dict:
-    result = db.set_user_role(username, payload.role)
+    result = await run_in_threadpool(db.set_user_role, username, payload.role)
     if not result.get("success"):
         raise HTTPException(status_code=404, detail=result.get("error", "User not found"))
-    db.log_security_event(
+    await audit_log.log_security_event(
         username=principal["username"],
         event_type="ROLE_UPDATED",
         reason=f"Set role for {username} to {payload.role}",
@@ -324,20 +371,20 @@ async def update_user_role(
     return {"success": True, "updated_user": username, "role": payload.role}
 
 
-@route_aliases(["/projects", "/api/projects", "/api/v1/projects"], methods=["GET"], tags=["work"])
+@router.get("/projects", tags=["work"])
 async def list_projects(principal: dict = Depends(get_current_principal)) -> dict:
-    result = db.get_projects_for_user(principal["user_id"])
+    result = await run_in_threadpool(db.get_projects_for_user, principal["user_id"])
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error", "Failed to fetch projects"))
     return result
 
 
-@route_aliases(["/projects", "/api/projects", "/api/v1/projects"], methods=["POST"], tags=["work"])
+@router.post("/projects", tags=["work"])
 async def create_project(payload: ProjectCreatePayload, principal: dict = Depends(get_current_principal)) -> dict:
-    result = db.create_project(principal["user_id"], payload.name, payload.description)
+    result = await run_in_threadpool(db.create_project, principal["user_id"], payload.name, payload.description)
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error", "Failed to create project"))
-    db.log_security_event(
+    await audit_log.log_security_event(
         username=principal["username"],
         event_type="PROJECT_CREATED",
         reason=f"Created project {result['project_id']}",
@@ -345,38 +392,31 @@ async def create_project(payload: ProjectCreatePayload, principal: dict = Depend
     return {"success": True, "project_id": result["project_id"]}
 
 
-@route_aliases(
-    ["/projects/{project_id}/tasks", "/api/projects/{project_id}/tasks", "/api/v1/projects/{project_id}/tasks"],
-    methods=["GET"],
-    tags=["work"],
-)
+@router.get("/projects/{project_id}/tasks", tags=["work"])
 async def list_project_tasks(project_id: int, principal: dict = Depends(get_current_principal)) -> dict:
-    _ensure_project_access(principal, project_id)
-    result = db.get_tasks_for_project(project_id)
+    await _ensure_project_access(principal, project_id)
+    result = await run_in_threadpool(db.get_tasks_for_project, project_id)
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error", "Failed to fetch tasks"))
     return result
 
 
-@route_aliases(
-    ["/projects/{project_id}/tasks", "/api/projects/{project_id}/tasks", "/api/v1/projects/{project_id}/tasks"],
-    methods=["POST"],
-    tags=["work"],
-)
+@router.post("/projects/{project_id}/tasks", tags=["work"])
 async def create_project_task(
     project_id: int,
     payload: TaskCreatePayload,
     principal: dict = Depends(get_current_principal),
 ) -> dict:
-    _ensure_project_access(principal, project_id)
+    await _ensure_project_access(principal, project_id)
     assignee_id = None
     if payload.assignee_username:
-        assignee_user = db.get_user(payload.assignee_username)
+        assignee_user = await run_in_threadpool(db.get_user, payload.assignee_username)
         if not assignee_user.get("success"):
             raise HTTPException(status_code=404, detail="Assignee not found")
         assignee_id = assignee_user["user"]["id"]
 
-    result = db.create_task(
+    result = await run_in_threadpool(
+        db.create_task,
         project_id=project_id,
         title=payload.title,
         description=payload.description,
@@ -388,7 +428,7 @@ async def create_project_task(
     )
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error", "Failed to create task"))
-    db.log_security_event(
+    await audit_log.log_security_event(
         username=principal["username"],
         event_type="TASK_CREATED",
         reason=f"Created task {result['task_id']} in project {project_id}",
@@ -396,21 +436,22 @@ async def create_project_task(
     return {"success": True, "task_id": result["task_id"]}
 
 
-@route_aliases(["/tasks/{task_id}", "/api/tasks/{task_id}", "/api/v1/tasks/{task_id}"], methods=["PATCH"], tags=["work"])
+@router.patch("/tasks/{task_id}", tags=["work"])
 async def update_task(task_id: int, payload: TaskUpdatePayload, principal: dict = Depends(get_current_principal)) -> dict:
-    task = db.get_task(task_id)
+    task = await run_in_threadpool(db.get_task, task_id)
     if not task.get("success"):
         raise HTTPException(status_code=404, detail=task.get("error", "Task not found"))
-    _ensure_project_access(principal, task["task"]["project_id"])
+    await _ensure_project_access(principal, task["task"]["project_id"])
 
     assignee_id = None
     if payload.assignee_username:
-        assignee_user = db.get_user(payload.assignee_username)
+        assignee_user = await run_in_threadpool(db.get_user, payload.assignee_username)
         if not assignee_user.get("success"):
             raise HTTPException(status_code=404, detail="Assignee not found")
         assignee_id = assignee_user["user"]["id"]
 
-    result = db.update_task(
+    result = await run_in_threadpool(
+        db.update_task,
         task_id=task_id,
         title=payload.title,
         description=payload.description,
@@ -421,7 +462,7 @@ async def update_task(task_id: int, payload: TaskUpdatePayload, principal: dict
     )
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error", "Failed to update task"))
-    db.log_security_event(
+    await audit_log.log_security_event(
         username=principal["username"],
         event_type="TASK_UPDATED",
         reason=f"Updated task {task_id}",
@@ -429,13 +470,97 @@ async def update_task(task_id: int, payload: TaskUpdatePayload, principal: dict
     return {"success": True, "task_id": task_id}
 
 
+# Set while /batch dispatches its operations. Sub-requests run in the same task,
+# so a nested /batch sees it however its path was spelled or encoded.
+_batch_dispatch: ContextVar[bool] = ContextVar("batch_dispatch", default=False)
+
+
+async def _refuse_nested_batch() -> None:
+    if _batch_dispatch.get():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nested batch requests are not allowed")
+
+
+@router.post("/batch", tags=["batch"], dependencies=[Depends(_refuse_nested_batch)])
+async def batch(
+    payload: BatchPayload,
+    request: Request,
+    authorization: str | None = Header(default=None, alias="Authorization"),
+) -> list[dict]:
+    # Sub-requests are dispatched in order straight into this app's ASGI callable,
+    # so a client pays one HTTP round trip for the whole bundle.
+    headers = {"Authorization": authorization} if authorization else {}
+    client = (request.client.host, request.client.port) if request.client else ("127.0.0.1", 123)
+    # A sub-request that raises comes back as that operation's 500 instead of
+    # failing the whole batch and discarding the results already collected.
+    transport = httpx.ASGITransport(app=app, client=client, raise_app_exceptions=False)
+    results = []
+    dispatch_token = _batch_dispatch.set(True)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://batch") as dispatcher:
+            for operation in payload.operations:
+                response = await dispatcher.request(
+                    operation.method,
+                    operation.path,
+                    json=operation.body,
+                    headers=headers,
+                )
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = response.text
+                results.append({"status": response.status_code, "body": body})
+    finally:
+        _batch_dispatch.reset(dispatch_token)
+    return results
+
+
+# Legacy clients still call the unprefixed and /api paths. The prefixed aliases
+# are included rather than mounted so they stay in the OpenAPI schema and honour
+# app.dependency_overrides; they go first so prefixed requests match early.
+for api_prefix in ("/api/v1", "/api"):
+    app.include_router(router, prefix=api_prefix)
 app.include_router(router)
 
 
+@app.on_event("startup")
+async def configure_threadpool() -> None:
+    # Blocking DB calls and password hashing run on the AnyIO worker pool; the
+    # default 40-token limiter throttles concurrent logins.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_max_workers
+    configure_password_hash_pool(settings.password_hash_workers)
+
+
+async def wal_checkpoint_loop() -> None:
+    # synchronous=NORMAL defers fsyncs to checkpoints; running them here keeps the
+    # WAL short instead of letting autocheckpoints land on a request's commit.
+    while True:
+        await asyncio.sleep(settings.sqlite_checkpoint_interval_seconds)
+        await run_in_threadpool(db.checkpoint_wal)
+
+
+@app.on_event("startup")
+async def promote_initial_admin() -> None:
+    user = await run_in_threadpool(db.get_user, settings.initial_admin_username)
+    if user.get("success") and user["user"].get("role") != "admin":
+        await run_in_threadpool(db.set_user_role, settings.initial_admin_username, "admin")
+
+
 @app.on_event("startup")
 async def start_background_tasks() -> None:
+    start_queue_logging()
+    audit_log.start()
     if settings.global_train_interval_seconds > 0:
         asyncio.create_task(realtime_service.auto_train_loop())
+    if settings.sqlite_checkpoint_interval_seconds > 0 and not db.is_postgres:
+        asyncio.create_task(wal_checkpoint_loop())
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks() -> None:
+    await audit_log.stop()
+    await close_alert_client()
+    await run_in_threadpool(shutdown_password_hash_pool)
+    stop_queue_logging()
 
 
 @app.websocket("/ws/behavioral")
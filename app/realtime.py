@@ -6,9 +6,11 @@ from collections import deque
 from datetime import datetime, timezone
 
 from fastapi import WebSocket
+from fastapi.concurrency import run_in_threadpool
 from starlette.websockets import WebSocketDisconnect
 
-from app.alerts import send_security_alert
+from app.alerts import dispatch_security_alert
+from app.audit import AuditLogBuffer
 from app.config import Settings
 from app.database import AuthDatabase
 from app.security import verify_access_token
@@ -19,9 +21,11 @@ AUTH_TOKEN = os.environ.get("AUTH_TOKEN")
 
 
 class RealtimeBehaviorService:
-    def __init__(self, settings: Settings, db: AuthDatabase):
+    def __init__(self, settings: Settings, db: AuthDatabase, audit_log: AuditLogBuffer | None = None):
         self.settings = settings
         self.db = db
+        # An unstarted buffer writes straight through, so standalone use keeps working.
+        self.audit_log = audit_log or AuditLogBuffer(db)
         self.analyzer = BehavioralAnalyzer()
         self.analyzer.load_models()
         self.user_sessions: dict[str, dict] = {}
@@ -137,8 +141,8 @@ class RealtimeBehaviorService:
             mouse=len(mouse_data),
         )
 
-        if self.db.is_user_blocked(username):
-            self.db.log_security_event(
+        if await run_in_threadpool(self.db.is_user_blocked, username):
+            await self.audit_log.log_security_event(
                 username=username,
                 event_type="BLOCKED_USER_ACTIVITY",
                 reason="Blocked user attempted behavioral_data",
@@ -169,10 +173,15 @@ class RealtimeBehaviorService:
             "risk_score": risk_score,
         }
 
-        user_info = self.db.get_user(username)
+        user_info = await run_in_threadpool(self.db.get_user, username)
         if user_info.get("success"):
-            self.db.save_behavioral_profile(
-                user_info["user"]["id"], session_id, keystroke_data, mouse_data, risk_score
+            await run_in_threadpool(
+                self.db.save_behavioral_profile,
+                user_info["user"]["id"],
+                session_id,
+                keystroke_data,
+                mouse_data,
+                risk_score,
             )
 
         if risk_score >= self.settings.anomaly_block_threshold:
@@ -185,15 +194,15 @@ class RealtimeBehaviorService:
                 risk_score=round(float(risk_score), 4),
                 threshold=self.settings.anomaly_block_threshold,
             )
-            self.db.block_user(username, session_id, risk_score, reason)
-            self.db.log_security_event(
+            await run_in_threadpool(self.db.block_user, username, session_id, risk_score, reason)
+            await self.audit_log.log_security_event(
                 username=username,
                 event_type="REALTIME_ANOMALY_BLOCK",
                 reason=reason,
                 session_id=session_id,
                 risk_score=risk_score,
             )
-            send_security_alert(
+            dispatch_security_alert(
                 {
                     "event_type": "REALTIME_ANOMALY_BLOCK",
                     "username": username,
@@ -229,8 +238,8 @@ class RealtimeBehaviorService:
         session_id = data.get("sessionId")
         self._record_event("user_auth_message", username=username, session_id=session_id)
 
-        if self.db.is_user_blocked(username):
-            self.db.log_security_event(
+        if await run_in_threadpool(self.db.is_user_blocked, username):
+            await self.audit_log.log_security_event(
                 username=username,
                 event_type="BLOCKED_USER_AUTH_ATTEMPT",
                 reason="Blocked user attempted user_authentication",
@@ -267,8 +276,8 @@ class RealtimeBehaviorService:
         feedback = data.get("feedback")
         behavioral_data = data.get("behavioralData")
 
-        if self.db.is_user_blocked(username):
-            self.db.log_security_event(
+        if await run_in_threadpool(self.db.is_user_blocked, username):
+            await self.audit_log.log_security_event(
                 username=username,
                 event_type="BLOCKED_USER_FEEDBACK",
                 reason="Blocked user attempted feedback",
@@ -327,7 +336,7 @@ class RealtimeBehaviorService:
 
     async def train_global_from_db(self) -> None:
         limit = max(1, int(self.settings.global_train_max_samples))
-        result = self.db.get_behavioral_training_data(limit=limit)
+        result = await run_in_threadpool(self.db.get_behavioral_training_data, limit=limit)
         if not result.get("success"):
             self._record_event("global_train_failed", reason=result.get("error", "db_error"))
             return
@@ -344,7 +353,7 @@ class RealtimeBehaviorService:
             self._record_event("global_train_skipped", reason="no_new_data", samples=len(dataset))
             return
         try:
-            await asyncio.to_thread(self.analyzer.train_global_model, dataset)
+            await run_in_threadpool(self.analyzer.train_global_model, dataset)
             self.last_global_train_at = datetime.now(timezone.utc)
             self.last_global_train_count = len(dataset)
             self._record_event(
@@ -368,7 +377,9 @@ class RealtimeBehaviorService:
             **fields,
         }
         self.recent_events.appendleft(event)
-        self.logger.info("realtime_event %s", json.dumps(event, default=str))
+        # Skip the JSON encode entirely when INFO is filtered out; this runs per behavioral packet.
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("realtime_event %s", json.dumps(event, default=str))
 
     def get_monitor_snapshot(self) -> dict:
         trained_profiles = sum(
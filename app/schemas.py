@@ -76,3 +76,13 @@ class TaskUpdatePayload(BaseModel):
     priority: str | None = Field(default=None, pattern="^(low|medium|high)$")
     assignee_username: str | None = Field(default=None, max_length=128)
     due_date: str | None = Field(default=None, max_length=64)
+
+
+class BatchOperation(BaseModel):
+    method: str = Field(pattern="^(GET|POST|PATCH|PUT|DELETE)$")
+    path: str = Field(min_length=1, max_length=512, pattern="^/")
+    body: dict | list | None = None
+
+
+class BatchPayload(BaseModel):
+    operations: list[BatchOperation] = Field(min_length=1, max_length=20)
@@ -4,7 +4,9 @@ import hmac
 import json
 import os
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
+from app.cache import TTLCache
 from app.config import Settings
 
 _UNSAFE_SECRETS = {
@@ -14,6 +16,11 @@ _UNSAFE_SECRETS = {
     "replace_with_strong_secret",
 }
 
+# Verified claims keyed by (secret, token): a bearer token is presented on every
+# request, so repeat hits skip the HMAC and decoding. Only successes are stored,
+# and expiry is re-checked on every hit.
+_verified_tokens = TTLCache(maxsize=10000, ttl=60.0)
+
 
 def _b64url_encode(data: bytes) -> str:
     return base64.urlsafe_b64encode(data).decode("utf-8").rstrip("=")
@@ -24,6 +31,18 @@ def _b64url_decode(data: str) -> bytes:
     return base64.urlsafe_b64decode(f"{data}{padding}")
 
 
+@lru_cache(maxsize=4)
+def _hmac_template(secret: str) -> hmac.HMAC:
+    return hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+
+
+def _sign(secret: str, signing_input: bytes) -> bytes:
+    # Copying a keyed HMAC skips re-deriving the inner/outer pads for every token.
+    mac = _hmac_template(secret).copy()
+    mac.update(signing_input)
+    return mac.digest()
+
+
 def get_jwt_secret(settings: Settings) -> str:
     candidate = (settings.jwt_secret_key or "").strip() or (os.environ.get("AUTH_TOKEN") or "").strip()
     if candidate.lower() in _UNSAFE_SECRETS or len(candidate) < 16:
@@ -49,22 +68,33 @@ def create_access_token(settings: Settings, username: str, user_id: int) -> tupl
     encoded_header = _b64url_encode(json.dumps(header, separators=(",", ":"), sort_keys=True).encode("utf-8"))
     encoded_payload = _b64url_encode(json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8"))
     signing_input = f"{encoded_header}.{encoded_payload}".encode("utf-8")
-    secret = get_jwt_secret(settings).encode("utf-8")
-    signature = hmac.new(secret, signing_input, hashlib.sha256).digest()
-    encoded_signature = _b64url_encode(signature)
+    encoded_signature = _b64url_encode(_sign(get_jwt_secret(settings), signing_input))
 
     return f"{encoded_header}.{encoded_payload}.{encoded_signature}", expires_at.isoformat()
 
 
 def verify_access_token(token: str, settings: Settings) -> dict:
+    secret = get_jwt_secret(settings)
+    cache_key = (secret, token)
+    payload = _verified_tokens.get(cache_key)
+    if payload is not None:
+        if int(payload["exp"]) <= int(datetime.now(timezone.utc).timestamp()):
+            _verified_tokens.pop(cache_key)
+            raise ValueError("Token expired")
+        return dict(payload)
+    payload = _verify_access_token(token, secret)
+    _verified_tokens.set(cache_key, payload)
+    return dict(payload)
+
+
+def _verify_access_token(token: str, secret: str) -> dict:
     try:
         encoded_header, encoded_payload, encoded_signature = token.split(".")
     except ValueError as exc:
         raise ValueError("Malformed JWT") from exc
 
     signing_input = f"{encoded_header}.{encoded_payload}".encode("utf-8")
-    secret = get_jwt_secret(settings).encode("utf-8")
-    expected_signature = hmac.new(secret, signing_input, hashlib.sha256).digest()
+    expected_signature = _sign(secret, signing_input)
     provided_signature = _b64url_decode(encoded_signature)
     if not hmac.compare_digest(expected_signature, provided_signature):
         raise ValueError("Invalid token signature")
@@ -0,0 +1,47 @@
+import time
+from collections import OrderedDict
+
+
+class LoginFailureLimiter:
+    """Count failed logins per username in fixed windows.
+
+    Once a username reaches ``max_failures`` within ``window_seconds`` further
+    attempts are refused until the window ends, so a brute-force burst stops
+    costing a password hash per request. State is per process and bounded to
+    ``max_entries`` usernames (the least recently failing are evicted first).
+    A ``max_failures`` of 0 disables the limiter.
+    """
+
+    def __init__(self, max_failures: int, window_seconds: float, max_entries: int = 100_000):
+        self.max_failures = max_failures
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._windows: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+    def retry_after(self, username: str) -> float:
+        """Seconds until ``username`` may try again; 0 when it is not locked out."""
+        if self.max_failures <= 0:
+            return 0.0
+        entry = self._windows.get(username)
+        if entry is None:
+            return 0.0
+        failures, started_at = entry
+        remaining = started_at + self.window_seconds - time.monotonic()
+        if remaining <= 0:
+            del self._windows[username]
+            return 0.0
+        return remaining if failures >= self.max_failures else 0.0
+
+    def record_failure(self, username: str) -> None:
+        if self.max_failures <= 0:
+            return
+        now = time.monotonic()
+        failures, started_at = self._windows.pop(username, (0, now))
+        if started_at + self.window_seconds <= now:
+            failures, started_at = 0, now
+        self._windows[username] = (failures + 1, started_at)
+        while len(self._windows) > self.max_entries:
+            self._windows.popitem(last=False)
+
+    def reset(self, username: str) -> None:
+        self._windows.pop(username, None)
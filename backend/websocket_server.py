@@ -14,7 +14,7 @@ if ROOT_DIR not in sys.path:
 
 from app.config import get_settings
 from app.database import AuthDatabase
-from app.alerts import send_security_alert
+from app.alerts import close_alert_client, dispatch_security_alert
 from app.security import verify_access_token
 
 AUTH_TOKEN = os.environ.get("AUTH_TOKEN")
@@ -179,7 +179,7 @@ class BehavioralWebSocketServer:
                 session_id=session_id,
                 risk_score=risk_score,
             )
-            send_security_alert(
+            dispatch_security_alert(
                 {
                     "event_type": "REALTIME_ANOMALY_BLOCK",
                     "username": user_id,
@@ -285,8 +285,11 @@ async def main():
     host = os.environ.get("WEBSOCKET_HOST", "0.0.0.0")
     port = int(os.environ.get("WEBSOCKET_PORT", 8765))
 
-    async with websockets.serve(server.register_client, host, port):
-        await asyncio.Future()  # run forever
+    try:
+        async with websockets.serve(server.register_client, host, port):
+            await asyncio.Future()  # run forever
+    finally:
+        await close_alert_client()
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -1,4 +1,5 @@
 import asyncio
+import json
 import unittest
 
 from app.main import health, start_session
@@ -8,7 +9,7 @@ from app.schemas import Credentials
 class SmokeTests(unittest.TestCase):
     def test_health_route(self) -> None:
         response = asyncio.run(health())
-        self.assertEqual(response['status'], 'healthy')
+        self.assertEqual(json.loads(response.body)['status'], 'healthy')
 
     def test_start_session_returns_access_token(self) -> None:
         payload = Credentials(username='smoke_user_for_start_session_test', password='secret123')
@@ -0,0 +1,94 @@
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.main import app, get_current_principal
+
+
+class BatchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = TestClient(app)
+
+    def test_nested_batch_is_rejected_however_the_path_is_spelled(self) -> None:
+        nested = {'operations': [{'method': 'GET', 'path': '/health'}]}
+        operations = [
+            {'method': 'POST', 'path': path, 'body': nested}
+            for path in ('/batch', '/api/%62atch', '/api/v1/%62atch')
+        ]
+        response = self.client.post('/batch', json={'operations': operations})
+        self.assertEqual(response.status_code, 200)
+        for result in response.json():
+            self.assertEqual(result['status'], 400)
+            self.assertEqual(result['body']['detail'], 'Nested batch requests are not allowed')
+
+    def test_operations_are_dispatched_in_order(self) -> None:
+        operations = [{'method': 'GET', 'path': '/health'}, {'method': 'GET', 'path': '/api/health'}]
+        response = self.client.post('/batch', json={'operations': operations})
+        self.assertEqual([result['status'] for result in response.json()], [200, 200])
+        self.assertEqual(response.json()[0]['body']['status'], 'healthy')
+
+    def test_failing_operation_does_not_discard_the_others(self) -> None:
+        def broken_principal() -> dict:
+            raise RuntimeError('boom')
+
+        app.dependency_overrides[get_current_principal] = broken_principal
+        self.addCleanup(app.dependency_overrides.clear)
+        operations = [
+            {'method': 'GET', 'path': '/health'},
+            {'method': 'GET', 'path': '/projects'},
+            {'method': 'GET', 'path': '/api/health'},
+        ]
+        response = self.client.post('/batch', json={'operations': operations})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['status'] for result in response.json()], [200, 500, 200])
+
+
+class RouteAliasTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = TestClient(app)
+        app.dependency_overrides[get_current_principal] = lambda: {'username': 'override_user', 'user_id': -1, 'role': 'user'}
+
+    def tearDown(self) -> None:
+        app.dependency_overrides.clear()
+
+    def test_every_alias_honours_dependency_overrides(self) -> None:
+        for path in ('/projects', '/api/projects', '/api/v1/projects'):
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 200, path)
+            self.assertEqual(response.json()['projects'], [])
+
+    def test_prefixed_aliases_are_in_openapi_schema(self) -> None:
+        paths = self.client.get('/openapi.json').json()['paths']
+        self.assertIn('/api/projects', paths)
+        self.assertIn('/api/v1/projects', paths)
+
+
+class UserRouteTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = TestClient(app)
+        app.dependency_overrides[get_current_principal] = lambda: {'username': 'mia', 'user_id': 7, 'role': 'user'}
+
+    def tearDown(self) -> None:
+        app.dependency_overrides.clear()
+
+    def test_user_response_only_exposes_user_info_fields(self) -> None:
+        row = {
+            'id': 7,
+            'username': 'mia',
+            'role': 'user',
+            'created_at': None,
+            'last_login': None,
+            'is_active': 1,
+            'password_hash': 'not-for-clients',
+        }
+        with mock.patch.object(main.db, 'get_user', return_value={'success': True, 'user': row}):
+            response = self.client.get('/user/mia')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('password_hash', response.json()['user'])
+        self.assertEqual(response.json()['user']['username'], 'mia')
+
+
+if __name__ == '__main__':
+    unittest.main()
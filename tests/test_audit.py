@@ -0,0 +1,71 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.audit import AuditLogBuffer
+from app.database import AuthDatabase
+
+
+class AuditLogBufferTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = AuthDatabase(str(Path(self.tmpdir.name) / 'users.db'))
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_buffered_rows_are_flushed_on_stop(self) -> None:
+        async def scenario() -> None:
+            buffer = AuditLogBuffer(self.db, batch_size=10, flush_interval=5.0)
+            buffer.start()
+            for i in range(3):
+                await buffer.log_login_attempt('ivy', 0, 0.1 * i, '127.0.0.1')
+            await buffer.log_security_event(username='ivy', event_type='TEST_EVENT', reason='buffered')
+            await buffer.stop()
+
+        asyncio.run(scenario())
+
+        events = self.db.get_security_events(limit=10, username='ivy')
+        self.assertEqual([e['event_type'] for e in events['events']], ['TEST_EVENT'])
+        with self.db._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM login_attempts WHERE username = 'ivy'")
+            self.assertEqual(cursor.fetchone()[0], 3)
+
+    def test_flush_writes_pending_rows_without_stopping(self) -> None:
+        async def scenario() -> int:
+            buffer = AuditLogBuffer(self.db, batch_size=10, flush_interval=30.0)
+            buffer.start()
+            await buffer.log_security_event(username='kim', event_type='TEST_EVENT', reason='flushed')
+            await buffer.flush()
+            count = len(self.db.get_security_events(limit=10, username='kim')['events'])
+            await buffer.stop()
+            return count
+
+        self.assertEqual(asyncio.run(scenario()), 1)
+
+    def test_writes_go_straight_through_when_not_started(self) -> None:
+        buffer = AuditLogBuffer(self.db)
+        asyncio.run(buffer.log_security_event(username='jack', event_type='TEST_EVENT', reason='direct'))
+        events = self.db.get_security_events(limit=10, username='jack')
+        self.assertEqual(len(events['events']), 1)
+
+    def test_producers_wait_for_room_when_the_queue_is_full(self) -> None:
+        async def scenario() -> None:
+            buffer = AuditLogBuffer(self.db, batch_size=10, flush_interval=0.01, max_queue=2)
+            buffer.start()
+            await asyncio.gather(*(buffer.log_login_attempt('lee', 0, 0.5, '127.0.0.1') for _ in range(10)))
+            await buffer.stop()
+
+        asyncio.run(scenario())
+
+        with self.db._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM login_attempts WHERE username = 'lee'")
+            self.assertEqual(cursor.fetchone()[0], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
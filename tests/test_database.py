@@ -1,8 +1,16 @@
+import gc
+import sqlite3
 import tempfile
+import threading
+import time
 import unittest
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from unittest import mock
 
-from app.database import AuthDatabase
+import app.database as database_module
+from app.database import SCHEMA_VERSION, AuthDatabase, configure_password_hash_pool, shutdown_password_hash_pool
 
 
 class AuthDatabaseTests(unittest.TestCase):
@@ -12,6 +20,7 @@ class AuthDatabaseTests(unittest.TestCase):
         self.db = AuthDatabase(self.db_path)
 
     def tearDown(self) -> None:
+        self.db.close()
         self.tmpdir.cleanup()
 
     def test_create_and_verify_user(self) -> None:
@@ -24,6 +33,107 @@ class AuthDatabaseTests(unittest.TestCase):
         self.assertEqual(verified['username'], 'alice')
         self.assertEqual(verified['role'], 'user')
 
+    def test_schema_setup_is_skipped_once_versioned(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(conn.execute('PRAGMA user_version').fetchone()[0], SCHEMA_VERSION)
+        conn.execute('DROP INDEX idx_users_role')
+        conn.commit()
+        conn.close()
+
+        reopened = AuthDatabase(self.db_path)
+        reopened.close()
+        conn = sqlite3.connect(self.db_path)
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list('users')")}
+        conn.close()
+        self.assertNotIn('idx_users_role', indexes)
+
+    def test_recreated_file_gets_its_schema_again(self) -> None:
+        self.db.close()
+        Path(self.db_path).unlink()
+        for suffix in ('-wal', '-shm'):
+            Path(self.db_path + suffix).unlink(missing_ok=True)
+
+        self.db = AuthDatabase(self.db_path)
+        self.assertTrue(self.db.create_user('olga', 'secret123')['success'])
+
+    def test_closed_instances_are_not_kept_alive(self) -> None:
+        extra = AuthDatabase(self.db_path)
+        ref = weakref.ref(extra)
+        extra.close()
+        del extra
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_checkpoint_truncates_wal(self) -> None:
+        self.assertTrue(self.db.create_user('ivy', 'secret123')['success'])
+        wal_path = Path(self.db_path + '-wal')
+        self.assertGreater(wal_path.stat().st_size, 0)
+
+        result = self.db.checkpoint_wal()
+        self.assertTrue(result['success'])
+        self.assertFalse(result['busy'])
+        self.assertEqual(wal_path.stat().st_size, 0)
+
+    def test_failed_write_does_not_leave_pooled_transaction_open(self) -> None:
+        self.assertTrue(self.db.create_user('gina', 'secret123')['success'])
+        self.assertFalse(self.db.create_user('gina', 'secret123')['success'])
+        self.assertTrue(self.db.create_user('hank', 'secret123')['success'])
+
+        conn = sqlite3.connect(self.db_path)
+        names = {row[0] for row in conn.execute('SELECT username FROM users')}
+        conn.close()
+        self.assertEqual(names, {'gina', 'hank'})
+
+    def test_legacy_pbkdf2_hash_still_verifies(self) -> None:
+        legacy_hash = AuthDatabase._pbkdf2_hash('secret123', 'legacy-salt')
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            'INSERT INTO users (username, password_hash, salt) VALUES (?, ?, ?)',
+            ('legacy', legacy_hash, 'legacy-salt'),
+        )
+        conn.commit()
+        conn.close()
+
+        self.assertTrue(self.db.verify_user('legacy', 'secret123')['success'])
+        self.assertFalse(self.db.verify_user('legacy', 'wrong-pass')['success'])
+
+        conn = sqlite3.connect(self.db_path)
+        stored_hash, salt = conn.execute("SELECT password_hash, salt FROM users WHERE username = 'legacy'").fetchone()
+        conn.close()
+        self.assertTrue(stored_hash.startswith('$argon2id$'))
+        self.assertEqual(salt, '')
+        self.assertTrue(self.db.verify_user('legacy', 'secret123')['success'])
+
+    def test_password_hashing_through_process_pool(self) -> None:
+        configure_password_hash_pool(1)
+        self.addCleanup(shutdown_password_hash_pool)
+
+        self.assertTrue(self.db.create_user('pia', 'secret123')['success'])
+        self.assertTrue(self.db.verify_user('pia', 'secret123')['success'])
+        self.assertFalse(self.db.verify_user('pia', 'wrong-password')['success'])
+
+    def test_in_thread_hashing_is_bounded(self) -> None:
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def tracked_hash(password: str) -> tuple[str, str]:
+            with lock:
+                running.append(password)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(password)
+            return password, ''
+
+        with (
+            mock.patch.object(database_module, '_kdf_slots', threading.BoundedSemaphore(2)),
+            mock.patch.object(database_module, '_hash_password', tracked_hash),
+        ):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(AuthDatabase._hash_password, [f'pw{i}' for i in range(8)]))
+        self.assertEqual(max(peak), 2)
+
     def test_block_user_disables_login_and_marks_blocked(self) -> None:
         created = self.db.create_user('bob', 'secret123')
         self.assertTrue(created['success'])
@@ -37,6 +147,33 @@ class AuthDatabaseTests(unittest.TestCase):
         self.assertTrue(self.db.is_user_blocked('bob'))
         self.assertTrue(self.db.is_user_id_blocked(created['user_id']))
 
+    def test_cached_user_lookups_see_block_and_role_changes(self) -> None:
+        created = self.db.create_user('hana', 'secret123')
+        self.assertTrue(created['success'])
+        self.assertFalse(self.db.is_user_blocked('hana'))
+        self.assertFalse(self.db.is_user_id_blocked(created['user_id']))
+
+        self.assertTrue(self.db.set_user_role('hana', 'admin')['success'])
+        self.assertEqual(self.db.get_user('hana')['user']['role'], 'admin')
+        self.assertEqual(self.db.get_user_by_id(created['user_id'])['user']['role'], 'admin')
+
+        self.db.block_user('hana', session_id=None, risk_score=0.9, reason='test')
+        self.assertTrue(self.db.is_user_blocked('hana'))
+        self.assertTrue(self.db.is_user_id_blocked(created['user_id']))
+
+    def test_get_or_create_creates_then_verifies(self) -> None:
+        created = self.db.get_or_create_user('omar', 'secret123')
+        self.assertTrue(created['success'])
+        self.assertTrue(created['is_new'])
+
+        existing = self.db.get_or_create_user('omar', 'secret123')
+        self.assertTrue(existing['success'])
+        self.assertFalse(existing['is_new'])
+        self.assertEqual(existing['user_id'], created['user_id'])
+
+        wrong = self.db.get_or_create_user('omar', 'not-the-password')
+        self.assertFalse(wrong['success'])
+
     def test_get_or_create_returns_block_error_for_blocked_user(self) -> None:
         created = self.db.create_user('charlie', 'secret123')
         self.assertTrue(created['success'])
@@ -64,6 +201,31 @@ class AuthDatabaseTests(unittest.TestCase):
         self.assertEqual(len(history['history']), 1)
         self.assertEqual(history['history'][0]['session_id'], 'session-3')
 
+    def test_session_events_are_appended_across_saves(self) -> None:
+        created = self.db.create_user('kara', 'secret123')
+        self.assertTrue(created['success'])
+
+        for ts in (1, 2):
+            saved = self.db.save_behavioral_profile(
+                user_id=created['user_id'],
+                session_id='session-append',
+                keystroke_data=[{'type': 'keydown', 'timestamp': ts}],
+                mouse_data=[{'type': 'mousemove', 'timestamp': ts}],
+                risk_score=0.1 * ts,
+            )
+            self.assertTrue(saved['success'])
+
+        history = self.db.get_behavioral_history(created['user_id'], 10)
+        self.assertEqual(len(history['history']), 1)
+        self.assertAlmostEqual(history['history'][0]['risk_score'], 0.2)
+
+        training = self.db.get_behavioral_training_data(limit=10)
+        self.assertTrue(training['success'])
+        self.assertEqual(len(training['dataset']), 1)
+        data = training['dataset'][0]['behavioral_data']
+        self.assertEqual([e['timestamp'] for e in data['keystrokeData']], [1, 2])
+        self.assertEqual([e['timestamp'] for e in data['mouseData']], [1, 2])
+
     def test_set_user_role_and_security_events(self) -> None:
         created = self.db.create_user('erin', 'secret123')
         self.assertTrue(created['success'])
@@ -115,6 +277,34 @@ class AuthDatabaseTests(unittest.TestCase):
         task = self.db.get_task(created_task['task_id'])
         self.assertTrue(task['success'])
         self.assertEqual(task['task']['status'], 'in_progress')
+        self.assertEqual(task['task']['title'], 'Build login screen')
+
+        missing = self.db.update_task(created_task['task_id'] + 100, status='done')
+        self.assertFalse(missing['success'])
+
+        self.assertEqual(self.db.get_project_owner(project['project_id'])['owner_id'], owner['user_id'])
+        self.assertFalse(self.db.get_project_owner(project['project_id'] + 100)['success'])
+
+    def test_bulk_user_and_task_creation(self) -> None:
+        created = self.db.create_users_bulk([('bulk1', 'secret123', 'user'), ('bulk2', 'secret456', 'analyst')])
+        self.assertEqual(created, {'success': True, 'count': 2})
+        self.assertTrue(self.db.verify_user('bulk2', 'secret456')['success'])
+        self.assertEqual(self.db.get_user('bulk2')['user']['role'], 'analyst')
+
+        duplicate = self.db.create_users_bulk([('bulk3', 'secret123', 'user'), ('bulk1', 'secret123', 'user')])
+        self.assertFalse(duplicate['success'])
+        self.assertFalse(self.db.get_user('bulk3')['success'])
+
+        owner_id = self.db.get_user('bulk1')['user']['id']
+        project = self.db.create_project(owner_id, 'Seeded')
+        tasks = self.db.create_tasks_bulk(
+            project['project_id'],
+            [('One', None, 'todo', 'low', None, None), ('Two', None, 'done', 'high', None, None)],
+            created_by=owner_id,
+        )
+        self.assertEqual(tasks, {'success': True, 'count': 2})
+        listed = self.db.get_tasks_for_project(project['project_id'])
+        self.assertEqual(sorted(task['title'] for task in listed['tasks']), ['One', 'Two'])
 
 
 if __name__ == '__main__':
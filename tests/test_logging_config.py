@@ -0,0 +1,47 @@
+import io
+import logging
+import logging.handlers
+import unittest
+
+from uvicorn.logging import AccessFormatter
+
+from app import logging_config
+
+
+class QueueLoggingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.logger = logging.getLogger('uvicorn.access')
+        self.saved = (self.logger.handlers[:], self.logger.level, self.logger.propagate)
+        self.stream = io.StringIO()
+        self.handler = logging.StreamHandler(self.stream)
+        self.handler.setFormatter(AccessFormatter('%(client_addr)s - "%(request_line)s" %(status_code)s', use_colors=False))
+        self.logger.handlers = [self.handler]
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+
+    def tearDown(self) -> None:
+        logging_config.stop_queue_logging()
+        self.logger.handlers, level, self.logger.propagate = self.saved
+        self.logger.setLevel(level)
+
+    def test_access_records_keep_their_args_through_the_queue(self) -> None:
+        logging_config.start_queue_logging()
+        self.logger.info('%s - "%s %s HTTP/%s" %d', '127.0.0.1:5000', 'GET', '/health', '1.1', 200)
+        logging_config.stop_queue_logging()
+        self.assertEqual(self.stream.getvalue(), '127.0.0.1:5000 - "GET /health HTTP/1.1" 200 OK\n')
+
+    def test_start_and_stop_swap_handlers_and_restore_them(self) -> None:
+        logging_config.start_queue_logging()
+        self.assertEqual(len(self.logger.handlers), 1)
+        self.assertIsInstance(self.logger.handlers[0], logging.handlers.QueueHandler)
+        logging_config.start_queue_logging()
+        self.assertEqual(len(self.logger.handlers), 1)
+
+        logging_config.stop_queue_logging()
+        self.assertEqual(self.logger.handlers, [self.handler])
+        logging_config.stop_queue_logging()
+        self.assertEqual(self.logger.handlers, [self.handler])
+
+
+if __name__ == '__main__':
+    unittest.main()
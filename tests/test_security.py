@@ -0,0 +1,40 @@
+import unittest
+from unittest import mock
+
+from app import security
+from app.config import Settings
+
+
+class AccessTokenTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.settings = Settings(app_env='production', jwt_secret_key='a-test-secret-of-enough-length')
+        security._verified_tokens.clear()
+
+    def test_repeat_verification_is_served_from_cache(self) -> None:
+        token, _ = security.create_access_token(self.settings, 'alice', 1)
+        first = security.verify_access_token(token, self.settings)
+        with mock.patch.object(security, '_verify_access_token') as verify:
+            second = security.verify_access_token(token, self.settings)
+        verify.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertEqual(second['sub'], 'alice')
+
+    def test_cached_token_is_rejected_once_expired(self) -> None:
+        token, _ = security.create_access_token(self.settings, 'bob', 2)
+        claims = security.verify_access_token(token, self.settings)
+        with mock.patch.object(security, 'datetime') as fake_datetime:
+            fake_datetime.now.return_value.timestamp.return_value = claims['exp'] + 1
+            with self.assertRaises(ValueError):
+                security.verify_access_token(token, self.settings)
+
+    def test_tampered_token_is_not_cached(self) -> None:
+        token, _ = security.create_access_token(self.settings, 'carol', 3)
+        tampered = token[:-2] + ('AA' if not token.endswith('AA') else 'BB')
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                security.verify_access_token(tampered, self.settings)
+        self.assertEqual(len(security._verified_tokens), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
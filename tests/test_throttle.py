@@ -0,0 +1,46 @@
+import unittest
+from unittest import mock
+
+from app import throttle
+from app.throttle import LoginFailureLimiter
+
+
+class LoginFailureLimiterTests(unittest.TestCase):
+    def test_locks_after_max_failures_until_window_ends(self) -> None:
+        limiter = LoginFailureLimiter(max_failures=3, window_seconds=60)
+        with mock.patch.object(throttle.time, 'monotonic', return_value=1000.0):
+            for _ in range(2):
+                limiter.record_failure('alice')
+            self.assertEqual(limiter.retry_after('alice'), 0.0)
+            limiter.record_failure('alice')
+            self.assertAlmostEqual(limiter.retry_after('alice'), 60.0)
+            self.assertEqual(limiter.retry_after('bob'), 0.0)
+
+        with mock.patch.object(throttle.time, 'monotonic', return_value=1061.0):
+            self.assertEqual(limiter.retry_after('alice'), 0.0)
+            limiter.record_failure('alice')
+            self.assertEqual(limiter.retry_after('alice'), 0.0)
+
+    def test_reset_clears_failures(self) -> None:
+        limiter = LoginFailureLimiter(max_failures=2, window_seconds=60)
+        limiter.record_failure('carol')
+        limiter.reset('carol')
+        limiter.record_failure('carol')
+        self.assertEqual(limiter.retry_after('carol'), 0.0)
+
+    def test_tracked_usernames_are_bounded(self) -> None:
+        limiter = LoginFailureLimiter(max_failures=1, window_seconds=60, max_entries=2)
+        for username in ('u1', 'u2', 'u3'):
+            limiter.record_failure(username)
+        self.assertEqual(limiter.retry_after('u1'), 0.0)
+        self.assertGreater(limiter.retry_after('u3'), 0.0)
+
+    def test_zero_max_failures_disables_limit(self) -> None:
+        limiter = LoginFailureLimiter(max_failures=0, window_seconds=60)
+        for _ in range(5):
+            limiter.record_failure('dave')
+        self.assertEqual(limiter.retry_after('dave'), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()